@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Benchmark de débit d'écriture par moteur × variante (mdp/tls/mtls/pkcs11).
+
+Réutilise les chemins d'écriture du seeder (COPY, INSERT multi-lignes,
+LOAD DATA LOCAL INFILE, insert_many) et mesure, pour chaque taille de lot
+(--batches, lignes par commit) et largeur de ligne (--widths, colonnes) :
+lignes/s, Mo/s et latence de commit. Chaque combinaison est rejouée
+--trials fois après --warmup essais non comptés, sur les mêmes données pour
+toutes les variantes d'un moteur.
+
+Les résultats bruts (un essai par ligne) sont écrits en JSON lines dans
+--out, avec un rapport texte qui compare chaque variante à mdp et, avec
+--baseline, à un run précédent (régressions signalées au-delà de --threshold).
+
+Les cibles sont celles du seeder (variables *_HOST / *_PORT) : à lancer
+dans le réseau dbnet, par exemple via le conteneur seeder.
+
+Exemples :
+  make bench-pg BENCH_ARGS="--batches 1000,10000 --widths 4,16"
+
+  python /app/bench.py --rows 50000 --trials 5 --out /bench
+  python /app/bench.py --report /bench/bench-20250101-120000.jsonl --baseline /bench/old.jsonl
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+import time
+import traceback
+
+import bson
+
+import seeder
+
+# Base dédiée (préfixe _seed_ : ignorée par tools/dump_tables.py)
+BENCH_DB = "_seed_bench"
+
+# Types logiques (seeder.TYPE_REGISTRY) cyclés pour construire une ligne de --widths colonnes
+BENCH_TYPES = ["int", "text", "double", "timestamp", "json", "bool", "date", "bytes"]
+
+
+def csv_ints(s):
+    return [int(x) for x in s.split(",") if x.strip()]
+
+
+def _pct(values, p):
+    """Percentile p (0-100) par rang le plus proche ; None si pas de valeurs."""
+    if not values:
+        return None
+    vals = sorted(values)
+    return vals[min(len(vals) - 1, int(round(p / 100 * (len(vals) - 1))))]
+
+
+# ---------- Cibles & données ----------
+def bench_targets():
+    """(label, moteur, variante, hôte, port, options) dérivés des cibles du seeder."""
+    targets = []
+    for label, fn, args, kwargs in seeder.seed_targets():
+        engine, variant = label.rsplit("_", 1)
+        if fn is seeder.seed_pg_variant:
+            targets.append((label, "pg", variant, args[1], args[2], {}))
+        elif fn is seeder.seed_mysql_like:
+            targets.append(
+                (label, engine, variant, args[1], args[2], {"root_pw_env": args[3]})
+            )
+        else:
+            targets.append((label, "mongo", variant, args[1], args[2], kwargs))
+    return targets
+
+
+def bench_schema(engine, width):
+    """Colonnes, genres et types SQL (None pour Mongo) d'une ligne de `width` colonnes."""
+    if engine == "mongo":
+        fields = [seeder.MONGO_FIELDS[j % len(seeder.MONGO_FIELDS)] for j in range(width)]
+        return [f"{name}_{j}" for j, (name, _) in enumerate(fields)], [k for _, k in fields], None
+    registry = seeder.TYPE_REGISTRY["pg" if engine == "pg" else "mysql"]
+    types = [registry[BENCH_TYPES[j % len(BENCH_TYPES)]] for j in range(width)]
+    return [f"c{j}" for j in range(width)], [t.kind for t in types], [t.sql for t in types]
+
+
+def bench_rows(engine, cols, kinds, n):
+    """n lignes [id, valeurs...] (documents pour Mongo), reproductibles pour SEED."""
+    flavor = "pg" if engine == "pg" else "mysql"
+    seeder.seed_generators(f"{seeder.SEED}:bench:{flavor}:{len(kinds)}")
+    columns = [c.tolist() for c in seeder.gen_columns(flavor, kinds, n)]
+    if engine == "mongo":
+        return [
+            dict(zip(cols, vals), _id=row_id)
+            for row_id, vals in zip(range(1, n + 1), zip(*columns))
+        ]
+    return [[row_id, *vals] for row_id, vals in zip(range(1, n + 1), zip(*columns))]
+
+
+def payload_bytes(engine, mode, kinds, rows):
+    """Taille du flux encodé côté client (hors protocole et TLS) : base des Mo/s."""
+    if engine == "mongo":
+        return sum(len(bson.encode(d)) for d in rows)
+    if engine == "pg":
+        if mode == "copy_binary":
+            plan = seeder.pg_row_plan("", [], ["int4"] + kinds, "copy_binary")
+            return len(seeder.copy_binary_chunk(plan.encoders, rows))
+        plan = seeder.pg_row_plan("", [], ["int4"] + kinds, "copy")
+        return len(seeder.copy_text_chunk(plan.encoders, rows))
+    plan = seeder.mysql_row_plan("", [], ["int"] + kinds, "infile")
+    return len(seeder.infile_chunk(plan.encoders, rows))
+
+
+# ---------- Sessions par moteur ----------
+# Une session expose prepare(table, cols, kinds, types) (table vidée/recréée,
+# hors chrono), write(lot) et commit(), plus le mode de chargement mesuré.
+def pg_session(host, port, opts):
+    conn = seeder.pg_conn(host, port, "postgres")
+    try:
+        conn.autocommit = True
+        cur = conn.cursor()
+        cur.execute("SELECT 1 FROM pg_database WHERE datname=%s", (BENCH_DB,))
+        if not cur.fetchone():
+            cur.execute(f'CREATE DATABASE "{BENCH_DB}"')
+    finally:
+        conn.close()
+
+    conn = seeder.pg_conn(host, port, BENCH_DB)
+    cur = conn.cursor()
+    mode = seeder.PG_LOAD_MODE
+    state = {}
+
+    def prepare(table, cols, kinds, types):
+        cur.execute(f'DROP TABLE IF EXISTS "{table}"')
+        defs = ", ".join(f"{c} {t}" for c, t in zip(cols, types))
+        cur.execute(f'CREATE TABLE "{table}" (id INT PRIMARY KEY, {defs})')
+        conn.commit()
+        state["plan"] = seeder.pg_row_plan(table, ["id"] + cols, ["int4"] + kinds, mode)
+
+    def write(rows):
+        if mode == "insert":
+            seeder.pg_insert_rows(cur, state["plan"], rows)
+        else:
+            seeder.pg_copy_rows(cur, state["plan"], rows)
+
+    return {
+        "mode": mode,
+        "prepare": prepare,
+        "write": write,
+        "commit": conn.commit,
+        "close": conn.close,
+    }
+
+
+def mysql_session(host, port, opts):
+    mode = seeder.MYSQL_LOAD_MODE
+    conn = seeder.mysql_conn(
+        host, port, None, opts["root_pw_env"], local_infile=(mode == "infile")
+    )
+    cur = conn.cursor()
+    if mode == "infile":
+        seeder.enable_local_infile(cur, "bench")
+    cur.execute(f"CREATE DATABASE IF NOT EXISTS `{BENCH_DB}`")
+    conn.select_db(BENCH_DB)
+    max_stmt = seeder.mysql_stmt_budget(cur)
+    state = {}
+
+    def prepare(table, cols, kinds, types):
+        cur.execute(f"DROP TABLE IF EXISTS `{table}`")
+        defs = ", ".join(f"{c} {t}" for c, t in zip(cols, types))
+        cur.execute(f"CREATE TABLE `{table}` (id INT PRIMARY KEY, {defs})")
+        conn.commit()
+        state["plan"] = seeder.mysql_row_plan(table, ["id"] + cols, ["int"] + kinds, mode)
+
+    def write(rows):
+        if mode == "insert":
+            seeder.mysql_insert_rows(cur, state["plan"], rows)
+        elif mode == "infile":
+            seeder.mysql_infile_rows(conn, cur, state["plan"], rows)
+        else:
+            seeder.mysql_multirow_rows(conn, cur, state["plan"], rows, max_stmt, commit=False)
+
+    return {
+        "mode": mode,
+        "prepare": prepare,
+        "write": write,
+        "commit": conn.commit,
+        "close": conn.close,
+    }
+
+
+def mongo_session(host, port, opts):
+    client = seeder.mongo_client(host, port, mtls=opts.get("mtls", False))
+    db = client[BENCH_DB]
+    state = {}
+
+    def prepare(table, cols, kinds, types):
+        db.drop_collection(table)
+        state["coll"] = db.get_collection(
+            table, write_concern=seeder.mongo_write_concern()
+        )
+
+    def write(docs):
+        state["coll"].insert_many(docs, ordered=False)
+
+    return {
+        # pas de commit séparé : l'acquittement (write concern) est dans insert_many
+        "mode": f"insert_many(w={seeder.MONGO_WRITE_CONCERN})",
+        "prepare": prepare,
+        "write": write,
+        "commit": None,
+        "close": client.close,
+    }
+
+
+SESSIONS = {
+    "pg": pg_session,
+    "mysql": mysql_session,
+    "mariadb": mysql_session,
+    "mongo": mongo_session,
+}
+
+
+# ---------- Mesure ----------
+def run_trial(sess, rows, batch):
+    """Un essai : lots de `batch` lignes, un commit par lot. Renvoie (durée, latences de commit)."""
+    commits = []
+    t0 = time.perf_counter()
+    for a in range(0, len(rows), batch):
+        sess["write"](rows[a : a + batch])
+        if sess["commit"] is not None:
+            tc = time.perf_counter()
+            sess["commit"]()
+            commits.append(time.perf_counter() - tc)
+    return time.perf_counter() - t0, commits
+
+
+def bench_target(target, a, run_id, data, emit):
+    """Toutes les combinaisons largeur × lot d'une cible ; les données sont partagées via `data`."""
+    label, engine, variant, host, port, opts = target
+    t0 = time.perf_counter()
+    sess = SESSIONS[engine](host, port, opts)
+    connect_s = time.perf_counter() - t0
+    print(f"[bench:{label}] connecté en {connect_s:.3f}s, mode={sess['mode']}", flush=True)
+    try:
+        for width in a.widths:
+            cols, kinds, types = bench_schema(engine, width)
+            key = (engine, width, sess["mode"])
+            if key not in data:
+                rows = bench_rows(engine, cols, kinds, a.rows)
+                data[key] = (rows, payload_bytes(engine, sess["mode"], kinds, rows))
+            rows, nbytes = data[key]
+            table = f"bench_w{width}"
+            for batch in a.batches:
+                for trial in range(-a.warmup, a.trials):
+                    sess["prepare"](table, cols, kinds, types)
+                    seconds, commits = run_trial(sess, rows, batch)
+                    if trial < 0:
+                        continue
+                    rec = {
+                        "run_id": run_id,
+                        "target": label,
+                        "engine": engine,
+                        "variant": variant,
+                        "mode": sess["mode"],
+                        "width": width,
+                        "batch": batch,
+                        "rows": len(rows),
+                        "trial": trial,
+                        "seconds": round(seconds, 6),
+                        "rows_per_s": round(len(rows) / seconds, 1),
+                        "payload_bytes": nbytes,
+                        "mb_per_s": round(nbytes / seconds / 1e6, 3),
+                        "commits": len(commits),
+                        "commit_ms_p50": _ms(_pct(commits, 50)),
+                        "commit_ms_p95": _ms(_pct(commits, 95)),
+                        "commit_ms_max": _ms(max(commits) if commits else None),
+                        "connect_s": round(connect_s, 6),
+                    }
+                    emit(rec)
+                    print(
+                        f"[bench:{label}] width={width} batch={batch} trial={trial} "
+                        f"{rec['rows_per_s']:.0f} rows/s {rec['mb_per_s']:.2f} MB/s "
+                        f"commit p50={rec['commit_ms_p50']}ms",
+                        flush=True,
+                    )
+    finally:
+        sess["close"]()
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+# ---------- Rapport ----------
+def summarize(records):
+    """Médianes par (cible, mode, largeur, lot, lignes) sur les essais d'un run."""
+    groups = {}
+    for r in records:
+        if "error" in r:
+            continue
+        key = (r["target"], r["mode"], r["width"], r["batch"], r["rows"])
+        groups.setdefault(key, []).append(r)
+    summary = {}
+    for key, rs in groups.items():
+        p50 = [r["commit_ms_p50"] for r in rs if r["commit_ms_p50"] is not None]
+        summary[key] = {
+            "engine": rs[0]["engine"],
+            "variant": rs[0]["variant"],
+            "trials": len(rs),
+            "rows_per_s": statistics.median(r["rows_per_s"] for r in rs),
+            "mb_per_s": statistics.median(r["mb_per_s"] for r in rs),
+            "commit_ms_p50": statistics.median(p50) if p50 else None,
+            "commit_ms_p95": max(
+                (r["commit_ms_p95"] for r in rs if r["commit_ms_p95"] is not None),
+                default=None,
+            ),
+        }
+    return summary
+
+
+def _delta(value, ref):
+    return None if not ref else (value / ref - 1) * 100
+
+
+def _fmt_delta(d):
+    return "-" if d is None else f"{d:+.1f}%"
+
+
+def render_report(records, baseline=None, threshold=10.0):
+    """Tableau texte : médianes, écart de débit vs mdp et vs baseline (même combinaison)."""
+    summary = summarize(records)
+    base = summarize(baseline) if baseline else {}
+    lines = []
+    header = (
+        f"{'target':<16} {'mode':<22} {'width':>5} {'batch':>6} {'trials':>6} "
+        f"{'rows/s':>10} {'MB/s':>8} {'commit p50':>10} {'p95':>8} {'vs mdp':>8} {'vs base':>8}"
+    )
+    lines.append(header)
+    lines.append("-" * len(header))
+    regressions = []
+    for key in sorted(summary):
+        target, mode, width, batch, rows = key
+        s = summary[key]
+        mdp_key = (f"{s['engine']}_mdp", mode, width, batch, rows)
+        vs_mdp = (
+            None
+            if s["variant"] == "mdp" or mdp_key not in summary
+            else _delta(s["rows_per_s"], summary[mdp_key]["rows_per_s"])
+        )
+        vs_base = _delta(s["rows_per_s"], base[key]["rows_per_s"]) if key in base else None
+        flag = ""
+        if vs_base is not None and vs_base < -threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        commit_p50 = "-" if s["commit_ms_p50"] is None else f"{s['commit_ms_p50']:.2f}ms"
+        commit_p95 = "-" if s["commit_ms_p95"] is None else f"{s['commit_ms_p95']:.2f}"
+        lines.append(
+            f"{target:<16} {mode:<22} {width:>5} {batch:>6} {s['trials']:>6} "
+            f"{s['rows_per_s']:>10.0f} {s['mb_per_s']:>8.2f} {commit_p50:>10} {commit_p95:>8} "
+            f"{_fmt_delta(vs_mdp):>8} {_fmt_delta(vs_base):>8}{flag}"
+        )
+    errors = [r for r in records if "error" in r]
+    for r in errors:
+        lines.append(f"{r['target']:<16} FAILED: {r['error']}")
+    if baseline:
+        lines.append(
+            f"\n{len(regressions)} régression(s) de débit > {threshold:.0f}% vs baseline"
+        )
+    return "\n".join(lines) + "\n", regressions
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--variants", default="mdp,tls,mtls,pkcs11")
+    ap.add_argument("--engines", default="pg,mysql,mariadb,mongo")
+    ap.add_argument("--batches", type=csv_ints, default=[1000, 10000])
+    ap.add_argument("--widths", type=csv_ints, default=[4, 16])
+    ap.add_argument("--rows", type=int, default=50000, help="lignes par essai")
+    ap.add_argument("--trials", type=int, default=3)
+    ap.add_argument("--warmup", type=int, default=1)
+    ap.add_argument("--out", default="./bench")
+    ap.add_argument("--baseline", help="résultats JSONL d'un run précédent à comparer")
+    ap.add_argument("--threshold", type=float, default=10.0, help="seuil de régression (%%)")
+    ap.add_argument("--report", help="ne rien mesurer : rapport d'un fichier JSONL existant")
+    a = ap.parse_args()
+
+    baseline = read_jsonl(a.baseline) if a.baseline else None
+    if a.report:
+        text, regressions = render_report(read_jsonl(a.report), baseline, a.threshold)
+        print(text, end="")
+        sys.exit(1 if regressions else 0)
+
+    variants = a.variants.split(",")
+    engines = a.engines.split(",")
+    targets = [t for t in bench_targets() if t[1] in engines and t[2] in variants]
+    if not targets:
+        print("Aucune cible configurée (*_MDP_HOST).", flush=True)
+        sys.exit(1)
+
+    run_id = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    os.makedirs(a.out, exist_ok=True)
+    results_path = os.path.join(a.out, f"bench-{run_id}.jsonl")
+    records = []
+    data = {}
+    with open(results_path, "w", encoding="utf-8") as f:
+
+        def emit(rec):
+            records.append(rec)
+            f.write(json.dumps(rec) + "\n")
+            f.flush()
+
+        # cibles l'une après l'autre : aucune ne partage le CPU/réseau d'une autre
+        for t in targets:
+            try:
+                bench_target(t, a, run_id, data, emit)
+            except Exception as e:
+                traceback.print_exc()
+                emit({"run_id": run_id, "target": t[0], "error": f"{type(e).__name__}: {e}"})
+
+    text, regressions = render_report(records, baseline, a.threshold)
+    report_path = os.path.join(a.out, f"bench-{run_id}.txt")
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    print("\n" + text, end="")
+    print(f"Résultats : {results_path}\nRapport : {report_path}", flush=True)
+    if regressions or any("error" in r for r in records):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
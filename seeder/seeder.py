@@ -1,18 +1,43 @@
+import collections
+import contextlib
+import datetime
+import fcntl
+import hashlib
+import itertools
 import json
+import math
+import multiprocessing
 import os
+import queue
 import random
+import shutil
+import socket
+import ssl
 import string
+import struct
 import sys
+import tempfile
+import threading
 import time
 import time as _time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
+import bson
+import numpy as np
 import psycopg2
 import pymysql
+import pymysql.cursors
+from bson.raw_bson import RawBSONDocument
 from faker import Faker
-from psycopg2 import OperationalError, sql
+from psycopg2 import OperationalError
 from psycopg2.extras import Json
-from pymongo import MongoClient
-from pymongo.errors import OperationFailure, ServerSelectionTimeoutError
+from pymongo import MongoClient, WriteConcern, monitoring
+from pymongo.errors import (
+    BulkWriteError,
+    OperationFailure,
+    ServerSelectionTimeoutError,
+)
 
 fake = Faker()
 
@@ -21,6 +46,56 @@ DB_COUNT = int(os.getenv("DB_COUNT", "3"))
 RECORDS_PER_DB = int(os.getenv("RECORDS_PER_DB", "500"))
 MIN_TABLES = int(os.getenv("MIN_TABLES", "4"))
 MAX_TABLES = int(os.getenv("MAX_TABLES", "10"))
+# Mode « taille cible » : Go par base (0 = RECORDS_PER_DB lignes par table). Les
+# lignes par table sont déduites de la largeur estimée des lignes ; au-delà de
+# TARGET_MAX_ROWS lignes, ce sont les textes qui s'élargissent.
+TARGET_GB = float(os.getenv("TARGET_GB", "0"))
+TARGET_MAX_ROWS = int(os.getenv("TARGET_MAX_ROWS", "5000000"))
+SEED_TEXT_CHARS = int(os.getenv("SEED_TEXT_CHARS", "80"))  # longueur max des textes générés
+# ref_id -> id d'une table parente, tiré selon une loi de Zipf d'exposant SEED_ZIPF_S
+SEED_ZIPF_S = float(os.getenv("SEED_ZIPF_S", "1.1"))
+# Après chargement : none | index (index sur ref_id) | fk (index + clé étrangère)
+SEED_REF_KEYS = os.getenv("SEED_REF_KEYS", "none").lower()
+
+# Nombre de cibles (moteur × variante) peuplées en parallèle ; 1 = séquentiel
+SEED_CONCURRENCY = int(os.getenv("SEED_CONCURRENCY", "4"))
+# Connexions parallèles par variante, et taille (en lignes) d'une unité de travail
+SEED_WORKERS = int(os.getenv("SEED_WORKERS", "4"))
+SEED_CHUNK_ROWS = int(os.getenv("SEED_CHUNK_ROWS", "10000"))
+# Fast load : réglages de session/DDL pour le chargement en masse (clés après coup, ANALYZE)
+SEED_FAST_LOAD = os.getenv("SEED_FAST_LOAD", "0").lower() in ("1", "true", "yes")
+# Générateur de lignes : columnar (NumPy + pools) | faker (cellule par cellule)
+SEED_GENERATOR = os.getenv("SEED_GENERATOR", "columnar").lower()
+SEED_POOL_SIZE = int(os.getenv("SEED_POOL_SIZE", "4096"))  # valeurs pré-générées par pool texte/JSON
+# Graine du dataset + répertoire du cache (monter un volume pour le garder entre deux runs)
+SEED = os.getenv("SEED", "0")
+SEED_NOW = datetime.datetime.fromisoformat(os.getenv("SEED_NOW", "2025-01-01"))
+SEED_CACHE_DIR = os.getenv(
+    "SEED_CACHE_DIR", os.path.join(tempfile.gettempdir(), "seeder-cache")
+)
+# Export des métriques (JSON lines + texte Prometheus) ; vide = pas d'export
+SEED_METRICS_DIR = os.getenv("SEED_METRICS_DIR", os.path.join(SEED_CACHE_DIR, "metrics"))
+
+# --- Chargement PostgreSQL : copy (COPY texte) | copy_binary (COPY binaire) | insert (1 INSERT/ligne) ---
+PG_LOAD_MODE = os.getenv("PG_LOAD_MODE", "copy").lower()
+PG_COPY_BATCH_ROWS = int(os.getenv("PG_COPY_BATCH_ROWS", "5000"))
+PG_COPY_READ_SIZE = 1 << 16
+
+# --- Chargement MySQL/MariaDB : multirow (executemany) | infile (LOAD DATA LOCAL) | insert (1 INSERT/ligne) ---
+MYSQL_LOAD_MODE = os.getenv("MYSQL_LOAD_MODE", "multirow").lower()
+MYSQL_BATCH_ROWS = int(os.getenv("MYSQL_BATCH_ROWS", "5000"))
+MYSQL_MAX_STMT_BYTES = int(os.getenv("MYSQL_MAX_STMT_BYTES", "0"))  # 0 = dérivé de max_allowed_packet
+
+# --- Chargement Mongo : writers concurrents, file bornée, write concern, fsync (end | db | off) ---
+MONGO_WRITERS = int(os.getenv("MONGO_WRITERS", "4"))
+MONGO_QUEUE_DEPTH = int(os.getenv("MONGO_QUEUE_DEPTH", "8"))  # paquets de SEED_CHUNK_ROWS docs
+MONGO_WRITE_CONCERN = os.getenv("MONGO_WRITE_CONCERN", "1")  # 0 | 1 | majority | ...
+MONGO_JOURNAL = os.getenv("MONGO_JOURNAL", "").lower() in ("1", "true", "yes") or None
+MONGO_FSYNC = os.getenv("MONGO_FSYNC", "end").lower()
+# Chemin RawBSON (opt-in) : documents encodés en BSON par MONGO_ENCODERS processus
+MONGO_RAW_BSON = os.getenv("MONGO_RAW_BSON", "0").lower() in ("1", "true", "yes")
+MONGO_ENCODERS = int(os.getenv("MONGO_ENCODERS", str(os.cpu_count() or 2)))
+MONGO_RAW_BATCH_BYTES = int(os.getenv("MONGO_RAW_BATCH_BYTES", str(16 * 1024 * 1024)))
 
 # --- TLS paths ---
 TLS_CA_FILE = os.getenv("TLS_CA_FILE", "/certs/ca/ca.crt")
@@ -59,6 +134,318 @@ def dump_env(prefix_filters=None):
     sys.stdout.flush()
 
 
+# ---------- Métriques ----------
+# Chaque cible (un processus du scheduler) collecte ses mesures dans METRICS :
+# événements chronométrés (connect, tls_handshake, ddl, dataset, load...) et
+# compteurs par table (lignes, octets envoyés, temps de génération et
+# d'écriture). run_target les renvoie au processus principal, qui les exporte
+# dans SEED_METRICS_DIR (seed-metrics-<moteur>.jsonl et .prom : les seeders
+# des quatre moteurs partagent le volume et tournent en même temps).
+TABLE_COUNTERS = ("rows", "bytes", "generate_s", "write_s")
+
+
+class Metrics:
+    """Collecteur thread-safe des mesures de la cible en cours."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset("")
+
+    def reset(self, target):
+        with self._lock:
+            self.target = target
+            self.events = []
+            self.tables = {}
+
+    def event(self, phase, seconds, **labels):
+        rec = {"target": self.target, "phase": phase, "seconds": round(seconds, 6)}
+        rec.update(labels)
+        with self._lock:
+            self.events.append(rec)
+
+    @contextlib.contextmanager
+    def timer(self, phase, **labels):
+        t0 = _time.perf_counter()
+        try:
+            yield
+        finally:
+            self.event(phase, _time.perf_counter() - t0, **labels)
+
+    def table_add(self, db, table, **counters):
+        with self._lock:
+            acc = self.tables.setdefault((db, table), dict.fromkeys(TABLE_COUNTERS, 0))
+            for k, v in counters.items():
+                acc[k] += v
+
+    @contextlib.contextmanager
+    def unit(self, unit):
+        """
+        Unité en cours du thread : le temps passé dans metered() et les octets
+        de unit_add() lui sont imputés ; le reste de sa durée compte en écriture.
+        """
+        stats = self._local.stats = {"generate_s": 0.0, "bytes": 0}
+        t0 = _time.perf_counter()
+        try:
+            yield
+            elapsed = _time.perf_counter() - t0
+            self.table_add(
+                unit.db,
+                unit.table,
+                rows=unit.count,
+                bytes=stats["bytes"],
+                generate_s=stats["generate_s"],
+                write_s=max(0.0, elapsed - stats["generate_s"]),
+            )
+        finally:
+            self._local.stats = None
+
+    def _stats(self):
+        return getattr(self._local, "stats", None) or {"generate_s": 0.0, "bytes": 0}
+
+    def unit_add(self, nbytes):
+        self._stats()["bytes"] += nbytes
+
+    def metered(self, rows):
+        """
+        Itère `rows` en imputant le temps de production à l'unité en cours,
+        même si l'itération a lieu dans un autre thread (FIFO de LOAD DATA).
+        """
+        stats = self._stats()
+
+        def gen():
+            it = iter(rows)
+            while True:
+                t0 = _time.perf_counter()
+                row = next(it, None)
+                stats["generate_s"] += _time.perf_counter() - t0
+                if row is None:
+                    return
+                yield row
+
+        return gen()
+
+    def snapshot(self):
+        with self._lock:
+            out = list(self.events)
+            for (db, table), acc in sorted(self.tables.items()):
+                rec = {"target": self.target, "phase": "table", "db": db, "table": table}
+                rec.update({k: round(v, 6) for k, v in acc.items()})
+                out.append(rec)
+        return out
+
+
+METRICS = Metrics()
+
+
+class MeteredSSLContext(ssl.SSLContext):
+    """
+    SSLContext qui chronomètre chaque poignée de main TLS (faite dans
+    wrap_socket) et propose au serveur la dernière session TLS connue pour le
+    même endpoint : s'il l'accepte, la poignée est abrégée (pas de signature
+    côté serveur). Une session n'est valable que dans son contexte : d'où le
+    partage des contextes via shared_ssl_context.
+    """
+
+    probe = False
+
+    def wrap_socket(self, sock, *args, **kwargs):
+        peer = (kwargs.get("server_hostname"), sock.getpeername()[1])
+        sessions = self.__dict__.setdefault("_sessions", {})
+        sockets = self.__dict__.setdefault("_sockets", {})
+        last = sockets.get(peer)
+        if last is not None and last.session is not None:
+            sessions[peer] = last.session  # ticket TLS 1.3 reçu après la poignée
+        if peer in sessions:
+            kwargs.setdefault("session", sessions[peer])
+        t0 = _time.perf_counter()
+        tls = super().wrap_socket(sock, *args, **kwargs)
+        sockets[peer] = tls
+        METRICS.event(
+            "tls_handshake",
+            _time.perf_counter() - t0,
+            endpoint=f"{peer[0]}:{peer[1]}",
+            resumed=tls.session_reused,
+            probe=self.probe,
+        )
+        return tls
+
+
+def client_ssl_context(cafile=None, certfile=None, keyfile=None, check_hostname=True):
+    """Contexte TLS client chronométré ; sans CA, pas de vérification du serveur."""
+    ctx = MeteredSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    if cafile:
+        ctx.load_verify_locations(cafile)
+        ctx.check_hostname = check_hostname
+    else:
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE
+    # certificats auto-signés de la sandbox : pas de contrôle X509 strict (Python 3.13)
+    ctx.verify_flags &= ~getattr(ssl, "VERIFY_X509_STRICT", 0)
+    if certfile:
+        ctx.load_cert_chain(certfile, keyfile)
+    return ctx
+
+
+_ssl_contexts = {}
+_ssl_contexts_lock = threading.Lock()
+
+
+def shared_ssl_context(cafile=None, certfile=None, keyfile=None, check_hostname=True):
+    """Un contexte par jeu de certificats pour tout le processus (reprise de session possible)."""
+    key = (cafile, certfile, keyfile, check_hostname)
+    with _ssl_contexts_lock:
+        ctx = _ssl_contexts.get(key)
+        if ctx is None:
+            ctx = _ssl_contexts[key] = client_ssl_context(*key)
+    return ctx
+
+
+def tls_probe(label, host, port, ctx, preamble=None):
+    """
+    Poignée TLS isolée vers un endpoint (connexion TCP dédiée) : libpq et
+    PyMongo ne laissent pas chronométrer la leur. `preamble` : octets envoyés
+    en clair avant TLS (SSLRequest de PostgreSQL), réponse attendue b"S".
+    Une sonde en échec est signalée sans interrompre le peuplement.
+    """
+    ctx.probe = True
+    try:
+        with socket.create_connection((host, int(port)), timeout=5) as raw:
+            if preamble:
+                raw.sendall(preamble)
+                if raw.recv(1) != b"S":
+                    raise RuntimeError("le serveur refuse TLS")
+            ctx.wrap_socket(raw, server_hostname=host).close()
+    except Exception as e:
+        print(f"[{label}] sonde TLS {host}:{port} ignorée: {e}", flush=True)
+
+
+def _prom_escape(v):
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _prom_line(name, labels, value):
+    inner = ",".join(f'{k}="{_prom_escape(v)}"' for k, v in labels.items())
+    return f"{name}{{{inner}}} {value}"
+
+
+def prometheus_text(records):
+    """Format texte Prometheus (exposition) : phases agrégées, compteurs par table et par cible."""
+    phases = {}
+    for r in records:
+        if r["phase"] in ("table", "target"):
+            continue
+        acc = phases.setdefault((r["target"], r["phase"]), [0.0, 0])
+        acc[0] += r["seconds"]
+        acc[1] += 1
+    lines = [
+        "# HELP seeder_phase_seconds Durée des phases (connect, tls_handshake, ddl, load...)",
+        "# TYPE seeder_phase_seconds summary",
+    ]
+    for (target, phase), (total, count) in sorted(phases.items()):
+        labels = {"target": target, "phase": phase}
+        lines.append(_prom_line("seeder_phase_seconds_sum", labels, round(total, 6)))
+        lines.append(_prom_line("seeder_phase_seconds_count", labels, count))
+
+    conns = collections.Counter(
+        (r["target"], r.get("endpoint", ""), bool(r.get("tls")))
+        for r in records
+        if r["phase"] == "connect"
+    )
+    lines += [
+        "# HELP seeder_connections_opened_total Connexions ouvertes par endpoint",
+        "# TYPE seeder_connections_opened_total counter",
+    ]
+    for (target, endpoint, tls), n in sorted(conns.items()):
+        labels = {"target": target, "endpoint": endpoint, "tls": str(tls).lower()}
+        lines.append(_prom_line("seeder_connections_opened_total", labels, n))
+    handshakes = collections.Counter(
+        (r["target"], r["endpoint"], bool(r.get("resumed")), bool(r.get("probe")))
+        for r in records
+        if r["phase"] == "tls_handshake"
+    )
+    lines += [
+        "# HELP seeder_tls_handshakes_total Poignées TLS côté client (resumed = session reprise)",
+        "# TYPE seeder_tls_handshakes_total counter",
+    ]
+    for (target, endpoint, resumed, probe), n in sorted(handshakes.items()):
+        labels = {
+            "target": target,
+            "endpoint": endpoint,
+            "resumed": str(resumed).lower(),
+            "probe": str(probe).lower(),
+        }
+        lines.append(_prom_line("seeder_tls_handshakes_total", labels, n))
+
+    tables = [r for r in records if r["phase"] == "table"]
+    for name, key, help_ in (
+        ("seeder_table_rows_total", "rows", "Lignes/documents écrits"),
+        ("seeder_table_bytes_sent_total", "bytes", "Octets de données envoyés (Mongo : estimation)"),
+        ("seeder_table_generate_seconds_total", "generate_s", "Temps de génération des lignes"),
+        ("seeder_table_write_seconds_total", "write_s", "Temps d'écriture (encodage, réseau, serveur)"),
+    ):
+        lines += [f"# HELP {name} {help_}", f"# TYPE {name} counter"]
+        for r in tables:
+            labels = {"target": r["target"], "db": r["db"], "table": r["table"]}
+            lines.append(_prom_line(name, labels, r[key]))
+
+    targets = [r for r in records if r["phase"] == "target"]
+    lines += [
+        "# HELP seeder_target_duration_seconds Durée totale par cible",
+        "# TYPE seeder_target_duration_seconds gauge",
+    ]
+    lines += [
+        _prom_line("seeder_target_duration_seconds", {"target": r["target"]}, r["seconds"])
+        for r in targets
+    ]
+    lines += [
+        "# HELP seeder_target_success 1 si la cible a été peuplée sans erreur",
+        "# TYPE seeder_target_success gauge",
+    ]
+    lines += [
+        _prom_line("seeder_target_success", {"target": r["target"]}, int(r["ok"]))
+        for r in targets
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def export_metrics(results):
+    """
+    Ajoute les mesures du run à seed-metrics-<moteur>.jsonl et réécrit
+    seed-metrics-<moteur>.prom. Un échec d'export est signalé sans changer
+    le statut du seeder.
+    """
+    if not SEED_METRICS_DIR:
+        return
+    try:
+        _export_metrics(results)
+    except OSError as e:
+        print(f"[metrics] export impossible : {type(e).__name__}: {e}", flush=True)
+
+
+def _export_metrics(results):
+    run = datetime.datetime.now().isoformat(timespec="seconds")
+    records = []
+    for label, ok, elapsed, _, recs in results:
+        records += recs
+        records.append(
+            {"target": label, "phase": "target", "seconds": round(elapsed, 6), "ok": ok}
+        )
+    # cibles pg_mdp, maria_tls... -> "pg", "maria" (plusieurs moteurs : joints par "-")
+    engine = "-".join(sorted({r[0].rsplit("_", 1)[0] for r in results}))
+    os.makedirs(SEED_METRICS_DIR, exist_ok=True)
+    jsonl = os.path.join(SEED_METRICS_DIR, f"seed-metrics-{engine}.jsonl")
+    with open(jsonl, "a", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps({"run": run, **r}, default=str) + "\n")
+    prom = os.path.join(SEED_METRICS_DIR, f"seed-metrics-{engine}.prom")
+    tmp = f"{prom}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus_text(records))
+    os.replace(tmp, prom)
+    print(f"[metrics] {len(records)} mesures -> {jsonl}, {prom}", flush=True)
+
+
 def rnd_word(n=8):
     return "".join(random.choices(string.ascii_lowercase, k=n))
 
@@ -89,75 +476,858 @@ def rnd_json_obj(max_depth=2):
     return json.dumps(obj, ensure_ascii=False)
 
 
+# ---------- Modèle de schéma typé ----------
+# Types logiques, communs à tous les moteurs ; le registre donne pour chaque
+# moteur le type SQL et le genre. Le genre pilote la génération
+# (COLUMN_GENERATORS), le stockage (_KIND_DTYPES) et l'encodage (encodeurs
+# COPY / LOAD DATA) : ajouter un type de colonne = une entrée par registre.
+EngineType = collections.namedtuple("EngineType", "sql kind")
+
+TYPE_REGISTRY = {
+    "pg": {
+        "int": EngineType("INT", "int4"),
+        "bigint": EngineType("BIGINT", "int8"),
+        "double": EngineType("DOUBLE PRECISION", "float8"),
+        "varchar": EngineType("VARCHAR(255)", "text"),
+        "text": EngineType("TEXT", "text"),
+        "date": EngineType("DATE", "date"),
+        "timestamp": EngineType("TIMESTAMP", "timestamp"),
+        "bool": EngineType("BOOLEAN", "bool"),
+        "bytes": EngineType("BYTEA", "bytea"),
+        "json": EngineType("JSONB", "json"),
+    },
+    "mysql": {
+        "int": EngineType("INT", "int"),
+        "bigint": EngineType("BIGINT", "int"),
+        "double": EngineType("DOUBLE", "double"),
+        "varchar": EngineType("VARCHAR(255)", "text"),
+        "text": EngineType("TEXT", "text"),
+        "date": EngineType("DATE", "date"),
+        "timestamp": EngineType("TIMESTAMP", "timestamp"),
+        "bool": EngineType("TINYINT(1)", "tinyint"),
+        "bytes": EngineType("BLOB", "blob"),
+        "json": EngineType("JSON", "json"),
+    },
+}
+TYPE_REGISTRY["maria"] = TYPE_REGISTRY["mysql"]
+
+# Colonne id (valeurs explicites au chargement)
+ID_TYPES = {
+    "pg": EngineType("SERIAL", "int4"),
+    "mysql": EngineType("INT AUTO_INCREMENT", "int"),
+    "maria": EngineType("INT AUTO_INCREMENT", "int"),
+}
+
+# type SQL -> genre, par moteur
+_SQL_KINDS = {
+    engine: {et.sql: et.kind for et in [*types.values(), ID_TYPES[engine]]}
+    for engine, types in TYPE_REGISTRY.items()
+}
+
+
+# Plan de ligne, compilé une fois par table et mode de chargement : colonnes,
+# genres, instruction préparée et un encodeur par colonne (None : la valeur
+# part telle quelle au pilote). Consommé par tous les writers.
+RowPlan = collections.namedtuple("RowPlan", "table cols kinds mode stmt encoders")
+
+
+def sql_kind(engine, decl):
+    """Genre d'un type SQL (déclaration `decl`) issu du registre de `engine`."""
+    try:
+        return _SQL_KINDS[engine][decl]
+    except KeyError:
+        raise ValueError(f"type {decl!r} absent du registre {engine}") from None
+
+
 def gen_schema(engine: str):
+    types = TYPE_REGISTRY[engine]
+    logical = list(types)
     tcount = random.randint(MIN_TABLES, MAX_TABLES)
     tables = []
     for i in range(tcount):
-        t = {"name": f"{rnd_word()}_{i+1}", "cols": []}
-        if engine == "pg":
-            t["cols"].append(("id", "SERIAL"))
-        else:
-            t["cols"].append(("id", "INT AUTO_INCREMENT"))
-        choices_map = {
-            "pg": [
-                "INT",
-                "BIGINT",
-                "DOUBLE PRECISION",
-                "VARCHAR(255)",
-                "TEXT",
-                "DATE",
-                "TIMESTAMP",
-                "BOOLEAN",
-                "BYTEA",
-                "JSONB",
-            ],
-            "mysql": [
-                "INT",
-                "BIGINT",
-                "DOUBLE",
-                "VARCHAR(255)",
-                "TEXT",
-                "DATE",
-                "TIMESTAMP",
-                "TINYINT(1)",
-                "BLOB",
-                "JSON",
-            ],
-            "maria": [
-                "INT",
-                "BIGINT",
-                "DOUBLE",
-                "VARCHAR(255)",
-                "TEXT",
-                "DATE",
-                "TIMESTAMP",
-                "TINYINT(1)",
-                "BLOB",
-                "JSON",
-            ],
-        }
+        t = {"name": f"{rnd_word()}_{i+1}", "cols": [("id", ID_TYPES[engine].sql)]}
         for _ in range(random.randint(6, 10)):
-            t["cols"].append((rnd_word(), random.choice(choices_map[engine])))
-        if random.random() < 0.2:
-            t["cols"].append(("ref_id", "INT"))
+            t["cols"].append((rnd_word(), types[random.choice(logical)].sql))
+        if random.random() < 0.2 and tables:
+            # parent pris parmi les tables précédentes : graphe sans cycle
+            t["cols"].append(("ref_id", types["int"].sql))
+            t["ref"] = random.choice(tables)["name"]
         tables.append(t)
     return tables
 
 
-# ---------- PostgreSQL ----------
-def pg_conn(host, port, dbname):
+# ---------- Génération colonnaire ----------
+# Une colonne entière (n valeurs) est produite d'un coup : tirages NumPy pour
+# les types numériques/temporels, échantillonnage dans des pools Faker
+# pré-construits pour le texte et le JSON. Mêmes distributions que le chemin
+# « une cellule à la fois » (SEED_GENERATOR=faker).
+_rng = np.random.default_rng()
+_pools = {}
+_text_chars = SEED_TEXT_CHARS  # élargi par size_tables() en mode TARGET_GB
+_pools_lock = threading.Lock()
+# « maintenant » figé (SEED_NOW) : les dates tirées ne dépendent pas du jour du run
+_NOW_US = int(
+    (SEED_NOW - datetime.datetime(1970, 1, 1)) // datetime.timedelta(microseconds=1)
+)
+_TODAY_DAYS = int(_NOW_US // 86_400_000_000)
+
+
+def _pool(name, make):
+    pool = _pools.get(name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                pool = np.empty(SEED_POOL_SIZE, dtype=object)
+                for k in range(SEED_POOL_SIZE):
+                    pool[k] = make()  # élément par élément : make() peut rendre une liste
+                _pools[name] = pool
+    return pool
+
+
+def _sample(name, make, n):
+    pool = _pool(name, make)
+    return pool[_rng.integers(0, len(pool), n)]
+
+
+def seed_generators(tag):
+    """Réinitialise random, Faker, _rng et les pools à partir de `tag` (données reproductibles)."""
+    global _rng, _text_chars
+    random.seed(tag)
+    Faker.seed(tag)
+    _rng = np.random.default_rng(list(tag.encode("utf-8")))
+    _pools.clear()
+    _text_chars = SEED_TEXT_CHARS
+
+
+def _col_int(n):
+    return _rng.integers(0, 1_000_001, n)
+
+
+def _col_tinyint(n):
+    return _rng.integers(0, 2, n, dtype=np.int8)
+
+
+def _col_double(n):
+    return _rng.uniform(0, 10_000, n)
+
+
+def _col_bool(n):
+    return _rng.random(n) < 0.5
+
+
+def _col_date(n):
+    # fake.date_object() : uniforme entre 1970-01-01 et aujourd'hui
+    return _rng.integers(0, _TODAY_DAYS + 1, n).astype("datetime64[D]")
+
+
+def _col_timestamp(n):
+    # fake.date_time() : uniforme entre l'epoch et maintenant, à la microseconde
+    return _rng.integers(0, _NOW_US + 1, n).astype("datetime64[us]")
+
+
+def _col_bytes(n):
+    raw = _rng.bytes(32 * n)
+    col = np.empty(n, dtype=object)
+    col[:] = [raw[i : i + 32] for i in range(0, 32 * n, 32)]
+    return col
+
+
+def _col_text(n):
+    return _sample(f"text:{_text_chars}", lambda: fake.text(_text_chars), n)
+
+
+def _col_pg_json(n):
+    # JSON déjà sérialisé : les encodeurs COPY/INSERT le transmettent tel quel
+    return _sample("pg_json", lambda: json.dumps(fake.pydict(5, True, True)), n)
+
+
+def _col_mysql_json(n):
+    return _sample("mysql_json", rnd_json_obj, n)
+
+
+# --- Champs des documents Mongo ---
+def _col_mg_name(n):
+    return _sample("mg_name", fake.name, n)
+
+
+def _col_mg_email(n):
+    return _sample("mg_email", fake.email, n)
+
+
+def _col_mg_qty(n):
+    return _rng.integers(1, 51, n, dtype=np.int32)
+
+
+def _col_mg_price(n):
+    return np.round(_rng.uniform(1, 9999, n), 2)
+
+
+def _col_mg_ts(n):
+    col = np.empty(n, dtype=object)
+    col[:] = [str(v) for v in _col_timestamp(n).tolist()]
+    return col
+
+
+def _col_mg_tags(n):
+    return _sample(
+        "mg_tags", lambda: [rnd_word(5) for _ in range(random.randint(1, 5))], n
+    )
+
+
+def _col_ref(n, parent_rows):
     """
-    Politique TLS par variante :
-      - pg-mdp ..................: sslmode=disable (plain)
-      - pg-tls ..................: sslmode=require + CA
-      - pg-mtls .................: sslmode=require + CA + cert client
-      - pg-pkcs11-client (CLIENT): sslmode=disable (TLS fait par le tunnel client)
-      - pg-pkcs11-frontend ......: (NON supporté en direct par libpq : le terminator attend TLS dès l'octet 0)
+    ids 1..parent_rows d'une table parente, loi de Zipf bornée (exposant
+    SEED_ZIPF_S) : quelques ids très référencés, une longue traîne. Les rangs
+    sont dispersés par une multiplication modulo parent_rows pour que les ids
+    « chauds » ne soient pas tous en tête de table.
     """
-    user = os.getenv("POSTGRES_USER", "pgadmin")
-    pwd = os.getenv("POSTGRES_PASSWORD", "pgadminpwd")
+    N, s = parent_rows, SEED_ZIPF_S
+    u = _rng.random(n)
+    # inverse de la fonction de répartition de x^-s sur [1, N + 1)
+    if abs(s - 1) < 1e-9:
+        x = (N + 1.0) ** u
+    else:
+        x = (1 + u * ((N + 1.0) ** (1 - s) - 1)) ** (1 / (1 - s))
+    ranks = np.minimum(x.astype(np.int64), N) - 1
+    mult = 2654435761 % N or 1
+    while math.gcd(mult, N) != 1:
+        mult += 1
+    return ranks * mult % N + 1
+
+
+def _col_mg_opt(n):
+    sentences = _sample("mg_sentence", fake.sentence, n)
+    urls = _sample("mg_url", fake.url, n)
+    pick = _rng.integers(0, 3, n)
+    return np.where(pick == 0, None, np.where(pick == 1, sentences, urls))
+
+
+# Documents Mongo : (champ, genre)
+MONGO_FIELDS = [
+    ("name", "mg_name"),
+    ("email", "mg_email"),
+    ("qty", "mg_qty"),
+    ("price", "mg_price"),
+    ("ts", "mg_ts"),
+    ("tags", "mg_tags"),
+    ("opt", "mg_opt"),
+]
+
+# genre (TYPE_REGISTRY / MONGO_FIELDS) -> générateur de colonne
+COLUMN_GENERATORS = {
+    # PostgreSQL
+    "int4": _col_int,
+    "int8": _col_int,
+    "float8": _col_double,
+    "bool": _col_bool,
+    "bytea": _col_bytes,
+    # MySQL / MariaDB
+    "int": _col_int,
+    "tinyint": _col_tinyint,
+    "double": _col_double,
+    "blob": _col_bytes,
+    # communs
+    "date": _col_date,
+    "timestamp": _col_timestamp,
+    "text": _col_text,
+    # Mongo
+    "mg_name": _col_mg_name,
+    "mg_email": _col_mg_email,
+    "mg_qty": _col_mg_qty,
+    "mg_price": _col_mg_price,
+    "mg_ts": _col_mg_ts,
+    "mg_tags": _col_mg_tags,
+    "mg_opt": _col_mg_opt,
+}
+JSON_GENERATORS = {"pg": _col_pg_json, "mysql": _col_mysql_json}
+
+
+def _faker_value(engine, kind):
+    if kind.startswith("mg_"):
+        return COLUMN_GENERATORS[kind](1)[0]
+    if engine == "pg":
+        v = pg_gen_value(kind)
+        return json.dumps(v) if kind == "json" else v
+    return mysql_gen_value(kind)
+
+
+def gen_columns(engine, kinds, n):
+    """
+    Une colonne NumPy de n valeurs par genre de `kinds` ; `engine` ("pg" ou
+    "mysql") choisit la saveur JSON. SEED_GENERATOR=faker retombe sur une
+    génération cellule par cellule (mêmes types, mêmes distributions).
+    """
+    if SEED_GENERATOR == "faker":
+        cols = []
+        for k in kinds:
+            col = np.empty(n, dtype=object)
+            col[:] = [_faker_value(engine, k) for _ in range(n)]
+            cols.append(col)
+        return cols
+    return [
+        (JSON_GENERATORS[engine] if k == "json" else COLUMN_GENERATORS[k])(n)
+        for k in kinds
+    ]
+
+
+# ---------- Cache de dataset (généré une fois, rejoué dans toutes les variantes) ----------
+# Un dataset par moteur : schéma + colonnes, stocké en colonnes dans
+# SEED_CACHE_DIR/<moteur>-<clé>/ et relu en mémoire mappée (np.load mmap).
+# La clé dépend de SEED et des knobs : tant qu'ils ne changent pas, le
+# dataset est réutilisé, y compris après un redémarrage du conteneur.
+DATASET_FORMAT = 2
+
+# dtype de stockage par genre ; absent = longueur variable (.bin + offsets)
+_KIND_DTYPES = {
+    "int4": "int32",
+    "int8": "int64",
+    "int": "int64",
+    "tinyint": "int8",
+    "float8": "float64",
+    "double": "float64",
+    "bool": "bool",
+    "date": "datetime64[D]",
+    "timestamp": "datetime64[us]",
+    "mg_qty": "int32",
+    "mg_price": "float64",
+}
+_BYTES_KINDS = ("bytea", "blob")
+
+
+def _encode_var(kind, v):
+    if kind in _BYTES_KINDS:
+        return bytes(v)
+    if kind == "mg_tags":
+        return json.dumps(v).encode("utf-8")
+    return str(v).encode("utf-8")
+
+
+def _decode_var(kind, b):
+    if kind in _BYTES_KINDS:
+        return b
+    if kind == "mg_tags":
+        return json.loads(b)
+    return b.decode("utf-8")
+
+
+def engine_kinds(engine, cols):
+    """Genres des colonnes de données (hors id) d'une table de gen_schema(engine)."""
+    if engine == "mongo":
+        return [k for _, k in cols]
+    return [sql_kind(engine, typ) for c, typ in cols if c != "id"]
+
+
+def gen_mongo_schema():
+    coln = random.randint(MIN_TABLES, MAX_TABLES)
+    return [
+        {"name": f"{rnd_word()}_{j}", "cols": list(MONGO_FIELDS)}
+        for j in range(1, coln + 1)
+    ]
+
+
+def dataset_key(engine):
+    knobs = {
+        "format": DATASET_FORMAT,
+        "engine": engine,
+        "seed": SEED,
+        "now": SEED_NOW.isoformat(),
+        "generator": SEED_GENERATOR,
+        "pool_size": SEED_POOL_SIZE,
+        "chunk_rows": SEED_CHUNK_ROWS,
+        "DB_COUNT": DB_COUNT,
+        "RECORDS_PER_DB": RECORDS_PER_DB,
+        "MIN_TABLES": MIN_TABLES,
+        "MAX_TABLES": MAX_TABLES,
+        "TARGET_GB": TARGET_GB,
+        "TARGET_MAX_ROWS": TARGET_MAX_ROWS,
+        "SEED_TEXT_CHARS": SEED_TEXT_CHARS,
+        "SEED_ZIPF_S": SEED_ZIPF_S,
+    }
+    raw = json.dumps(knobs, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()[:16], knobs
+
+
+def _write_column(base, kind, chunks, n):
+    """Écrit une colonne (itérable de morceaux NumPy) dans base.npy ou base.bin/.off/.null."""
+    dtype = _KIND_DTYPES.get(kind)
+    if dtype:
+        arr = np.lib.format.open_memmap(base + ".npy", mode="w+", dtype=dtype, shape=(n,))
+        pos = 0
+        for chunk in chunks:
+            arr[pos : pos + len(chunk)] = chunk
+            pos += len(chunk)
+        arr.flush()
+        del arr
+        return
+    offsets = np.lib.format.open_memmap(
+        base + ".off.npy", mode="w+", dtype="int64", shape=(n + 1,)
+    )
+    nulls = np.lib.format.open_memmap(
+        base + ".null.npy", mode="w+", dtype="bool", shape=(n,)
+    )
+    offsets[0] = 0
+    pos, size = 0, 0
+    with open(base + ".bin", "wb") as f:
+        for chunk in chunks:
+            for v in chunk.tolist():
+                if v is None:
+                    nulls[pos] = True
+                else:
+                    b = _encode_var(kind, v)
+                    f.write(b)
+                    size += len(b)
+                pos += 1
+                offsets[pos] = size
+    offsets.flush()
+    nulls.flush()
+    del offsets, nulls
+
+
+# Surcoût fixe estimé par ligne/document (en-tête de tuple, pointeur, id)
+ROW_OVERHEAD_BYTES = 32
+
+
+def _kind_bytes(flavor, kind, sample=512):
+    """Taille moyenne (octets) d'une valeur de `kind`, mesurée sur un échantillon."""
+    dtype = _KIND_DTYPES.get(kind)
+    if dtype:
+        return np.dtype(dtype).itemsize
+    col = gen_columns(flavor, [kind], sample)[0]
+    return sum(len(_encode_var(kind, v)) for v in col.tolist() if v is not None) / sample
+
+
+def size_tables(engine, schemas):
+    """
+    Mode TARGET_GB : fixe t["rows"] pour que chaque base pèse ~TARGET_GB (part
+    égale par table, lignes = part / largeur estimée de ligne). Si une table
+    moyenne dépasse TARGET_MAX_ROWS lignes, les textes sont élargis d'abord.
+    """
+    global _text_chars
+    flavor = "pg" if engine == "pg" else "mysql"
+    widths = {}
+
+    def row_bytes(t):
+        for k in t["kinds"]:
+            if k not in widths:
+                widths[k] = _kind_bytes(flavor, k)
+        return ROW_OVERHEAD_BYTES + sum(widths[k] for k in t["kinds"])
+
+    tables = [t for schema in schemas for t in schema]
+    budget = TARGET_GB * (1 << 30)
+    share = budget * len(schemas) / len(tables)  # octets par table en moyenne
+    avg_row = sum(row_bytes(t) for t in tables) / len(tables)
+    if share / avg_row > TARGET_MAX_ROWS and "text" in widths:
+        # largeur de ligne visée pour TARGET_MAX_ROWS lignes, portée par les textes
+        texts = sum(t["kinds"].count("text") for t in tables) / len(tables)
+        base = widths.pop("text")
+        need = share / TARGET_MAX_ROWS - avg_row + texts * base
+        scale = need / (texts * base)
+        _text_chars = min(16_000, max(SEED_TEXT_CHARS, int(SEED_TEXT_CHARS * scale)))
+        if _text_chars > 255:
+            # VARCHAR(255) ne tient plus : ces colonnes passent en TEXT
+            for t in tables:
+                t["cols"] = [
+                    (c, "TEXT" if typ == "VARCHAR(255)" else typ) for c, typ in t["cols"]
+                ]
+    for schema in schemas:
+        for t in schema:
+            t["rows"] = max(1, int(budget / len(schema) / row_bytes(t)))
+    rows = [t["rows"] for t in tables]
+    print(
+        f"[dataset:{engine}] TARGET_GB={TARGET_GB:g}: {len(tables)} tables, "
+        f"{min(rows)}..{max(rows)} rows/table, texts <= {_text_chars} chars",
+        flush=True,
+    )
+
+
+def build_dataset(engine, path, knobs):
+    """Génère schémas + données de `engine` dans `path` (écriture atomique via .tmp)."""
+    t0 = _time.perf_counter()
+    # Le dataset ne dépend que de SEED et du moteur (pas de l'ordre des cibles)
+    seed_generators(f"{SEED}:{engine}")
+
+    flavor = "pg" if engine == "pg" else "mysql"
+    tmp = path + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    schemas = []
+    for i in range(1, DB_COUNT + 1):
+        schema = gen_mongo_schema() if engine == "mongo" else gen_schema(engine)
+        for t in schema:
+            t["kinds"] = engine_kinds(engine, t["cols"])
+            t["rows"] = RECORDS_PER_DB
+        schemas.append(schema)
+    if TARGET_GB > 0:
+        size_tables(engine, schemas)
+
+    manifest = {
+        "key": os.path.basename(path),
+        "knobs": knobs,
+        "text_chars": _text_chars,
+        "dbs": [],
+    }
+    for i, schema in enumerate(schemas, 1):
+        rows = {t["name"]: t["rows"] for t in schema}
+        for t in schema:
+            tdir = os.path.join(tmp, f"db{i}", t["name"])
+            os.makedirs(tdir)
+            data_cols = [c for c, _ in t["cols"] if c != "id"]
+            for j, kind in enumerate(t["kinds"]):
+                if t.get("ref") and data_cols[j] == "ref_id":
+                    parent_rows = rows[t["ref"]]
+                    chunks = (
+                        _col_ref(min(SEED_CHUNK_ROWS, t["rows"] - s), parent_rows)
+                        for s in range(0, t["rows"], SEED_CHUNK_ROWS)
+                    )
+                else:
+                    chunks = (
+                        gen_columns(flavor, [kind], min(SEED_CHUNK_ROWS, t["rows"] - s))[0]
+                        for s in range(0, t["rows"], SEED_CHUNK_ROWS)
+                    )
+                _write_column(os.path.join(tdir, f"c{j}"), kind, chunks, t["rows"])
+        manifest["dbs"].append({"tables": schema})
+    with open(os.path.join(tmp, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.rename(tmp, path)
+    # un seul dataset conservé par moteur : les anciennes clés sont obsolètes
+    prefix = f"{engine}-"
+    for entry in os.listdir(SEED_CACHE_DIR):
+        old = os.path.join(SEED_CACHE_DIR, entry)
+        if entry.startswith(prefix) and not old.startswith(path):
+            if os.path.isdir(old):
+                shutil.rmtree(old, ignore_errors=True)
+            else:
+                os.remove(old)
+    print(
+        f"[dataset:{engine}] built {path} in {(_time.perf_counter()-t0):.2f}s",
+        flush=True,
+    )
+
+
+class Dataset:
+    """Dataset en cache, relu en mémoire mappée ; lecture par plage d'ids."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self._cols = {}
+        self._lock = threading.Lock()
+
+    @property
+    def key(self):
+        return self.manifest["key"]
+
+    def schema(self, i):
+        """Tables de la base n°i (1-based) : name, cols, kinds, rows."""
+        return self.manifest["dbs"][i - 1]["tables"]
 
+    def _column(self, i, table, j, kind):
+        key = (i, table, j)
+        col = self._cols.get(key)
+        if col is None:
+            base = os.path.join(self.path, f"db{i}", table, f"c{j}")
+            if kind in _KIND_DTYPES:
+                col = np.load(base + ".npy", mmap_mode="r")
+            else:
+                col = (
+                    np.load(base + ".off.npy", mmap_mode="r"),
+                    np.load(base + ".null.npy", mmap_mode="r"),
+                    np.memmap(base + ".bin", mode="r", dtype=np.uint8)
+                    if os.path.getsize(base + ".bin")
+                    else np.zeros(0, dtype=np.uint8),
+                )
+            with self._lock:
+                self._cols[key] = col
+        return col
+
+    def columns(self, i, table, start, count):
+        """Colonnes (listes Python) des lignes d'ids [start, start + count)."""
+        t = next(t for t in self.schema(i) if t["name"] == table)
+        a, b = start - 1, start - 1 + count
+        out = []
+        for j, kind in enumerate(t["kinds"]):
+            col = self._column(i, table, j, kind)
+            if kind in _KIND_DTYPES:
+                out.append(col[a:b].tolist())
+                continue
+            offsets, nulls, data = col
+            offs = offsets[a : b + 1].tolist()
+            base = offs[0]
+            blob = data[base : offs[-1]].tobytes()
+            out.append(
+                [
+                    None if null else _decode_var(kind, blob[o - base : p - base])
+                    for o, p, null in zip(offs, offs[1:], nulls[a:b].tolist())
+                ]
+            )
+        return out
+
+    def rows(self, i, table, start, count):
+        """Lignes [id, valeurs...] pour les ids [start, start + count), lues à la première demande."""
+        cols = self.columns(i, table, start, count)
+        for row_id, vals in zip(range(start, start + count), zip(*cols)):
+            yield [row_id, *vals]
+
+
+def load_dataset(engine):
+    """Ouvre le dataset de `engine`, en le construisant si besoin (un seul processus à la fois)."""
+    key, knobs = dataset_key(engine)
+    path = os.path.join(SEED_CACHE_DIR, f"{engine}-{key}")
+    os.makedirs(SEED_CACHE_DIR, exist_ok=True)
+    t0 = _time.perf_counter()
+    with open(path + ".lock", "w") as lock:
+        # les 4 variantes d'un moteur tournent dans des processus parallèles
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        built = not os.path.exists(os.path.join(path, "manifest.json"))
+        if built:
+            build_dataset(engine, path, knobs)
+        else:
+            print(f"[dataset:{engine}] reuse {path}", flush=True)
+    METRICS.event("dataset", _time.perf_counter() - t0, engine=engine, built=built)
+    return Dataset(path)
+
+
+# ---------- Unités de travail (parallélisme intra-variante) ----------
+# Une unité = une plage d'ids [start, start + count) d'une table d'une base.
+# Les ids sont écrits explicitement : quel que soit l'ordre d'exécution des
+# workers, chaque table contient exactement les ids 1..rows (RECORDS_PER_DB
+# ou la taille calculée en mode TARGET_GB).
+WorkUnit = collections.namedtuple("WorkUnit", "db table plan start count")
+
+
+def split_units(db, plan, total, chunk):
+    return [
+        WorkUnit(db, plan.table, plan, start, min(chunk, total - start + 1))
+        for start in range(1, total + 1, max(1, chunk))
+    ]
+
+
+def interleave_units(units):
+    # 1re plage de chaque table, puis 2e, etc. : les workers concurrents
+    # écrivent autant que possible dans des tables (et bases) différentes.
+    return sorted(units, key=lambda u: (u.start, u.db, u.table))
+
+
+def run_units(label, units, connect, write_unit, use_db=None, workers=None, release=None):
+    """
+    Exécute les unités avec `workers` threads, chacun avec sa propre connexion.
+
+    connect(db) ouvre une connexion ; write_unit(conn, unit) écrit une unité et
+    commit (mesurée via METRICS.unit). Si use_db(conn, db) est fourni (MySQL), un worker garde une seule
+    connexion et change de base ; sinon (PG) il garde une connexion par base.
+    En fin de worker, release(conn, db) rend chaque connexion (à un
+    ConnectionPool) ; par défaut elle est fermée. La première erreur arrête
+    les autres workers puis est relevée ici.
+    """
+    workers = max(1, min(workers or SEED_WORKERS, len(units)))
+    q = queue.Queue()
+    for u in units:
+        q.put(u)
+    remaining = collections.Counter((u.db, u.table) for u in units)
+    lock = threading.Lock()
+    stop = threading.Event()
+    errors = []
+
+    def worker():
+        conns = {}
+        current_db = None
+        try:
+            while not stop.is_set():
+                try:
+                    unit = q.get_nowait()
+                except queue.Empty:
+                    return
+                if use_db:
+                    conn = conns.get(None)
+                    if conn is None:
+                        conn = conns[None] = connect(unit.db)
+                    elif current_db != unit.db:
+                        use_db(conn, unit.db)
+                    current_db = unit.db
+                else:
+                    conn = conns.get(unit.db)
+                    if conn is None:
+                        conn = conns[unit.db] = connect(unit.db)
+                with METRICS.unit(unit):
+                    write_unit(conn, unit)
+                with lock:
+                    remaining[(unit.db, unit.table)] -= 1
+                    done = remaining[(unit.db, unit.table)] == 0
+                if done:
+                    print(f"[{label}] db={unit.db} table={unit.table} done", flush=True)
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+            traceback.print_exc()
+        finally:
+            for db, c in conns.items():
+                try:
+                    if release:
+                        release(c, current_db if db is None else db)
+                    else:
+                        c.close()
+                except Exception:
+                    pass
+
+    threads = [
+        threading.Thread(target=worker, name=f"{label}-w{n}", daemon=True)
+        for n in range(workers)
+    ]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    if errors:
+        raise errors[0]
+
+
+# ---------- Connexions partagées par endpoint ----------
+class ConnectionPool:
+    """
+    Connexions inactives d'une cible, rangées par clé (endpoint, ou endpoint +
+    base pour PG qui ne change pas de base) : les phases (DDL, chargement,
+    finalisation) se repassent les mêmes connexions au lieu d'en rouvrir, donc
+    de refaire une poignée TLS (et, sur pkcs11, une signature HSM côté proxy).
+    """
+
+    def __init__(self, label):
+        self.label = label
+        self._lock = threading.Lock()
+        self._idle = collections.defaultdict(list)
+        self.opened = collections.Counter()
+
+    def acquire(self, key, open_conn):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop()
+        conn = open_conn()
+        with self._lock:
+            self.opened[key] += 1
+        return conn
+
+    def release(self, key, conn):
+        """Rend une connexion (transaction en cours annulée) ; inutilisable, elle est fermée."""
+        try:
+            conn.rollback()
+        except Exception:
+            try:
+                conn.close()
+            except Exception:
+                pass
+            return
+        with self._lock:
+            self._idle[key].append(conn)
+
+    @contextlib.contextmanager
+    def connection(self, key, open_conn):
+        conn = self.acquire(key, open_conn)
+        try:
+            yield conn
+        finally:
+            self.release(key, conn)
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, collections.defaultdict(list)
+        for conns in idle.values():
+            for c in conns:
+                try:
+                    c.close()
+                except Exception:
+                    pass
+        opened = ", ".join(
+            f"{'/'.join(str(k) for k in key if k is not None)}={n}"
+            for key, n in sorted(self.opened.items(), key=str)
+        )
+        print(
+            f"[{self.label}] connexions ouvertes : {sum(self.opened.values())} ({opened})",
+            flush=True,
+        )
+
+
+# ---------- Points de reprise ----------
+# Chaque base cible garde la liste des unités terminées, écrite dans la même
+# transaction que la fin de l'unité. Au redémarrage, le dataset (donc le
+# schéma et les lignes) est identique : les unités faites sont sautées et les
+# lignes d'unités interrompues sont purgées avant d'être réécrites.
+CHECKPOINT_TABLE = "_seed_checkpoint"
+CHECKPOINT_DDL = (
+    f"CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} ("
+    "dataset VARCHAR(64) NOT NULL, tbl VARCHAR(128) NOT NULL, "
+    "start_id INT NOT NULL, nrows INT NOT NULL, "
+    "done_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, "
+    "PRIMARY KEY (dataset, tbl, start_id))"
+)
+
+
+def load_checkpoints(cur, key):
+    """{(table, start_id)} des unités déjà terminées pour le dataset `key`."""
+    cur.execute(CHECKPOINT_DDL)
+    cur.execute(
+        f"SELECT tbl, start_id FROM {CHECKPOINT_TABLE} WHERE dataset = %s", (key,)
+    )
+    return {(t, s) for t, s in cur.fetchall()}
+
+
+def mark_checkpoint(cur, key, unit):
+    cur.execute(
+        f"INSERT INTO {CHECKPOINT_TABLE} (dataset, tbl, start_id, nrows) "
+        "VALUES (%s, %s, %s, %s)",
+        (key, unit.table, unit.start, unit.count),
+    )
+
+
+def table_exists(cur, table, schema_expr):
+    cur.execute(
+        "SELECT 1 FROM information_schema.tables "
+        f"WHERE table_schema = {schema_expr} AND table_name = %s",
+        (table,),
+    )
+    return cur.fetchone() is not None
+
+
+def purge_unfinished(cur, qtable, table, key):
+    """Supprime les lignes hors des plages d'ids marquées terminées (reprise)."""
+    cur.execute(
+        f"DELETE FROM {qtable} WHERE NOT EXISTS ("
+        f"SELECT 1 FROM {CHECKPOINT_TABLE} c WHERE c.dataset = %s AND c.tbl = %s "
+        f"AND {qtable}.id >= c.start_id AND {qtable}.id < c.start_id + c.nrows)",
+        (key, table),
+    )
+    return cur.rowcount
+
+
+def check_ref_keys():
+    if SEED_REF_KEYS not in ("none", "index", "fk"):
+        raise RuntimeError(f"SEED_REF_KEYS={SEED_REF_KEYS!r} inconnu (none | index | fk)")
+
+
+def ref_index_name(table):
+    return f"ix_{table}_ref_id"
+
+
+def ref_fk_name(table):
+    return f"fk_{table}_ref_id"
+
+
+def pending_units(units, done, label):
+    todo = [u for u in units if (u.table, u.start) not in done]
+    if len(todo) < len(units):
+        print(
+            f"[{label}] reprise : {len(units) - len(todo)}/{len(units)} unités déjà faites",
+            flush=True,
+        )
+    return todo
+
+
+# ---------- PostgreSQL ----------
+def pg_ssl_mode(host):
+    """(sslmode, mTLS ?) pour un hôte PG, selon la politique décrite dans pg_conn."""
     # Détections
+
     is_plain = host == "pg-mdp"
     is_tls = host == "pg-tls"
     is_mtls = host in ("pg-mtls", "pg-mtls-frontend")
@@ -180,6 +1350,22 @@ def pg_conn(host, port, dbname):
         # Par défaut, on sécurise.
         sslmode = "require"
 
+    return sslmode, is_mtls
+
+
+def pg_conn(host, port, dbname):
+    """
+    Politique TLS par variante :
+      - pg-mdp ..................: sslmode=disable (plain)
+      - pg-tls ..................: sslmode=require + CA
+      - pg-mtls .................: sslmode=require + CA + cert client
+      - pg-pkcs11-client (CLIENT): sslmode=disable (TLS fait par le tunnel client)
+      - pg-pkcs11-frontend ......: (NON supporté en direct par libpq : le terminator attend TLS dès l'octet 0)
+    """
+    user = os.getenv("POSTGRES_USER", "pgadmin")
+    pwd = os.getenv("POSTGRES_PASSWORD", "pgadminpwd")
+    sslmode, is_mtls = pg_ssl_mode(host)
+
     parts = [
         f"host={host}",
         f"port={int(port)}",
@@ -207,16 +1393,387 @@ def pg_conn(host, port, dbname):
     dsn = " ".join(parts)
     try:
         print(f"Connecting to PG {host}:{port}/{dbname} (sslmode={sslmode})...")
-        return psycopg2.connect(dsn)
+        t0 = _time.perf_counter()
+        conn = psycopg2.connect(dsn)
+        METRICS.event(
+            "connect",
+            _time.perf_counter() - t0,
+            endpoint=f"{host}:{port}",
+            db=dbname,
+            tls=sslmode != "disable",
+        )
+        return conn
     except OperationalError as e:
         print(f"[PG] OperationalError: {e}")
         raise
 
 
+PG_SSL_REQUEST = struct.pack("!ii", 8, 80877103)
+
+
+def pg_tls_probe(label, host, port):
+    """Poignée TLS de référence vers un endpoint PG en sslmode=require (cf. tls_probe)."""
+    sslmode, is_mtls = pg_ssl_mode(host)
+    if sslmode == "disable":
+        return
+    ctx = client_ssl_context(
+        TLS_CA_FILE if os.path.exists(TLS_CA_FILE) else None,
+        TLS_CLIENT_CERT if is_mtls else None,
+        TLS_CLIENT_KEY if is_mtls else None,
+        check_hostname=False,  # require + sslrootcert : chaîne vérifiée, pas le nom
+    )
+    tls_probe(label, host, port, ctx, preamble=PG_SSL_REQUEST)
+
+
+PG_EPOCH_DATE = datetime.date(2000, 1, 1)
+PG_EPOCH_TS = datetime.datetime(2000, 1, 1)
+PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+PGCOPY_TRAILER = struct.pack("!h", -1)
+
+
+def pg_gen_value(kind):
+    if kind in ("int4", "int8"):
+        return random.randint(0, 1_000_000)
+    if kind == "float8":
+        return random.uniform(0, 10_000)
+    if kind == "bool":
+        return random.choice([True, False])
+    if kind == "date":
+        return fake.date_object(end_datetime=SEED_NOW)
+    if kind == "timestamp":
+        return fake.date_time(end_datetime=SEED_NOW)
+    if kind == "json":
+        return fake.pydict(5, True, True)
+    if kind == "bytea":
+        return random.randbytes(32)
+    return fake.text(_text_chars)
+
+
+# --- Encodage COPY (format texte) ---
+_COPY_TEXT_ESCAPES = str.maketrans(
+    {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"}
+)
+
+
+def _copy_text_int(v):
+    return str(int(v))
+
+
+def _copy_text_float(v):
+    return repr(float(v))
+
+
+def _copy_text_bool(v):
+    return "t" if v else "f"
+
+
+def _copy_text_date(v):
+    return v.isoformat()
+
+
+def _copy_text_timestamp(v):
+    return v.isoformat(sep=" ")
+
+
+def _copy_text_bytea(v):
+    # sortie hex de bytea ; le backslash est lui-même échappé en format texte
+    return "\\\\x" + bytes(v).hex()
+
+
+def _copy_text_json(v):
+    if not isinstance(v, str):
+        v = json.dumps(v, ensure_ascii=False)
+    return v.translate(_COPY_TEXT_ESCAPES)
+
+
+def _copy_text_str(v):
+    return str(v).translate(_COPY_TEXT_ESCAPES)
+
+
+COPY_TEXT_ENCODERS = {
+    "int4": _copy_text_int,
+    "int8": _copy_text_int,
+    "float8": _copy_text_float,
+    "bool": _copy_text_bool,
+    "date": _copy_text_date,
+    "timestamp": _copy_text_timestamp,
+    "bytea": _copy_text_bytea,
+    "json": _copy_text_json,
+    "text": _copy_text_str,
+}
+
+
+def copy_text_chunk(encoders, rows):
+    lines = [
+        "\t".join(["\\N" if v is None else enc(v) for enc, v in zip(encoders, row)])
+        for row in rows
+    ]
+    lines.append("")
+    return "\n".join(lines).encode("utf-8")
+
+
+# --- Encodage COPY (format binaire) ---
+_PACK_I4 = struct.Struct("!ii").pack
+_PACK_I8 = struct.Struct("!iq").pack
+_PACK_F8 = struct.Struct("!id").pack
+_PACK_LEN = struct.Struct("!i").pack
+_PACK_NFIELDS = struct.Struct("!h").pack
+
+
+_BINARY_NULL = _PACK_LEN(-1)
+
+
+def _copy_binary_int4(v):
+    return _PACK_I4(4, v)
+
+
+def _copy_binary_int8(v):
+    return _PACK_I8(8, v)
+
+
+def _copy_binary_float8(v):
+    return _PACK_F8(8, v)
+
+
+def _copy_binary_bool(v):
+    return b"\x00\x00\x00\x01\x01" if v else b"\x00\x00\x00\x01\x00"
+
+
+def _copy_binary_date(v):
+    return _PACK_I4(4, (v - PG_EPOCH_DATE).days)
+
+
+def _copy_binary_timestamp(v):
+    return _PACK_I8(8, (v - PG_EPOCH_TS) // datetime.timedelta(microseconds=1))
+
+
+def _copy_binary_bytea(v):
+    data = bytes(v)
+    return _PACK_LEN(len(data)) + data
+
+
+def _copy_binary_json(v):
+    # jsonb binaire = octet de version (1) + texte JSON
+    if not isinstance(v, str):
+        v = json.dumps(v, ensure_ascii=False)
+    data = b"\x01" + v.encode("utf-8")
+    return _PACK_LEN(len(data)) + data
+
+
+def _copy_binary_str(v):
+    data = str(v).encode("utf-8")
+    return _PACK_LEN(len(data)) + data
+
+
+COPY_BINARY_ENCODERS = {
+    "int4": _copy_binary_int4,
+    "int8": _copy_binary_int8,
+    "float8": _copy_binary_float8,
+    "bool": _copy_binary_bool,
+    "date": _copy_binary_date,
+    "timestamp": _copy_binary_timestamp,
+    "bytea": _copy_binary_bytea,
+    "json": _copy_binary_json,
+    "text": _copy_binary_str,
+}
+
+
+def copy_binary_chunk(encoders, rows):
+    nfields = _PACK_NFIELDS(len(encoders))
+    out = []
+    for row in rows:
+        out.append(nfields)
+        out.extend([_BINARY_NULL if v is None else enc(v) for enc, v in zip(encoders, row)])
+    return b"".join(out)
+
+
+class CopyStream:
+    """
+    Objet « fichier » minimal (read) pour cur.copy_expert : les lignes sont
+    générées et encodées par paquets à la demande, jamais toutes en mémoire.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buf = bytearray()
+        self.nbytes = 0
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buf) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buf += chunk
+            self.nbytes += len(chunk)
+        if size < 0:
+            size = len(self._buf)
+        out = bytes(self._buf[:size])
+        del self._buf[:size]
+        return out
+
+
+def _batched(it, n):
+    it = iter(it)
+    while True:
+        batch = list(itertools.islice(it, n))
+        if not batch:
+            return
+        yield batch
+
+
+def _pg_param(v):
+    return v
+
+
+def _pg_json_param(v):
+    return v if isinstance(v, str) else Json(v)
+
+
+def pg_row_plan(table, cols, kinds, mode=None):
+    """Compile le RowPlan d'une table pour PG_LOAD_MODE (ou `mode`)."""
+    mode = mode or PG_LOAD_MODE
+    col_list = ", ".join(cols)
+    if mode == "insert":
+        placeholders = ", ".join(["%s"] * len(cols))
+        stmt = f'INSERT INTO "{table}" ({col_list}) VALUES ({placeholders})'
+        encoders = [_pg_json_param if k == "json" else _pg_param for k in kinds]
+    elif mode == "copy_binary":
+        stmt = f'COPY "{table}" ({col_list}) FROM STDIN WITH (FORMAT binary)'
+        encoders = [COPY_BINARY_ENCODERS[k] for k in kinds]
+    else:
+        stmt = f'COPY "{table}" ({col_list}) FROM STDIN'
+        encoders = [COPY_TEXT_ENCODERS[k] for k in kinds]
+    return RowPlan(table, tuple(cols), tuple(kinds), mode, stmt, tuple(encoders))
+
+
+def pg_copy_rows(cur, plan, rows):
+    """Charge `rows` via le COPY ... FROM STDIN (texte ou binaire) du plan, en streaming."""
+    if plan.mode == "copy_binary":
+
+        def chunks():
+            yield PGCOPY_HEADER
+            for batch in _batched(rows, PG_COPY_BATCH_ROWS):
+                yield copy_binary_chunk(plan.encoders, batch)
+            yield PGCOPY_TRAILER
+
+    else:
+
+        def chunks():
+            for batch in _batched(rows, PG_COPY_BATCH_ROWS):
+                yield copy_text_chunk(plan.encoders, batch)
+
+    stream = CopyStream(chunks())
+    cur.copy_expert(plan.stmt, stream, size=PG_COPY_READ_SIZE)
+    METRICS.unit_add(stream.nbytes)
+
+
+def pg_insert_rows(cur, plan, rows):
+    """Ancien chemin : un INSERT (un aller-retour) par ligne."""
+    nbytes = 0
+    for row in rows:
+        cur.execute(plan.stmt, [enc(v) for enc, v in zip(plan.encoders, row)])
+        nbytes += len(cur.query)
+    METRICS.unit_add(nbytes)
+
+
+def pg_write_unit(conn, unit, rows, key):
+    cur = conn.cursor()
+    try:
+        if unit.plan.mode == "insert":
+            pg_insert_rows(cur, unit.plan, rows)
+        else:
+            pg_copy_rows(cur, unit.plan, rows)
+        mark_checkpoint(cur, key, unit)
+        conn.commit()
+    finally:
+        cur.close()
+
+
+def pg_load_session(conn):
+    """Prépare une connexion au chargement ; en fast load, commits asynchrones pour la session."""
+    if SEED_FAST_LOAD:
+        with conn.cursor() as cur:
+            cur.execute("SET synchronous_commit = off")
+        conn.commit()
+    return conn
+
+
+def pg_finalize_table(cur, table):
+    """
+    Après chargement : séquence SERIAL recalée sur les ids explicites et, en
+    fast load, clé primaire construite en une passe, table repassée en LOGGED
+    puis ANALYZE.
+    """
+    cur.execute(
+        f"SELECT setval(pg_get_serial_sequence(%s, 'id'), MAX(id)) FROM \"{table}\"",
+        (f'"{table}"',),
+    )
+    if not SEED_FAST_LOAD:
+        return
+    cur.execute(
+        "SELECT c.relpersistence, EXISTS (SELECT 1 FROM pg_index i "
+        "WHERE i.indrelid = c.oid AND i.indisprimary) "
+        "FROM pg_class c WHERE c.oid = %s::regclass",
+        (f'"{table}"',),
+    )
+    persistence, has_pk = cur.fetchone()
+    if not has_pk:
+        cur.execute(f'ALTER TABLE "{table}" ADD PRIMARY KEY (id)')
+    if persistence == "u":
+        cur.execute(f'ALTER TABLE "{table}" SET LOGGED')
+    cur.execute(f'ANALYZE "{table}"')
+
+
+def pg_add_refs(cur, schema):
+    """
+    SEED_REF_KEYS, une fois toutes les tables de la base chargées et
+    finalisées : index sur ref_id puis (fk) clé étrangère vers la table parente.
+    """
+    if SEED_REF_KEYS == "none":
+        return
+    for t in schema:
+        parent = t.get("ref")
+        if not parent:
+            continue
+        table = t["name"]
+        cur.execute(
+            f'CREATE INDEX IF NOT EXISTS "{ref_index_name(table)}" ON "{table}" (ref_id)'
+        )
+        if SEED_REF_KEYS != "fk":
+            continue
+        cur.execute(
+            "SELECT 1 FROM pg_constraint WHERE conrelid = %s::regclass AND conname = %s",
+            (f'"{table}"', ref_fk_name(table)),
+        )
+        if cur.fetchone() is None:
+            cur.execute(
+                f'ALTER TABLE "{table}" ADD CONSTRAINT "{ref_fk_name(table)}" '
+                f'FOREIGN KEY (ref_id) REFERENCES "{parent}" (id)'
+            )
+
+
 def seed_pg_variant(name, host, port):
+    if PG_LOAD_MODE not in ("copy", "copy_binary", "insert"):
+        raise RuntimeError(
+            f"PG_LOAD_MODE={PG_LOAD_MODE!r} inconnu (copy | copy_binary | insert)"
+        )
+    check_ref_keys()
+    pg_tls_probe(f"PG:{name}", host, port)
+    pool = ConnectionPool(f"PG:{name}")
+    try:
+        _seed_pg_variant(name, host, port, pool)
+    finally:
+        pool.close_all()
+
+
+def _seed_pg_variant(name, host, port, pool):
+    def connect(dbn):
+        return pool.acquire((host, port, dbn), lambda: pg_conn(host, port, dbn))
+
     # --- Création des DB (hors transaction) ---
-    conn = pg_conn(host, port, "postgres")
+    conn = connect("postgres")
     try:
+        t0 = _time.perf_counter()
         conn.autocommit = True
         cur = conn.cursor()
         for i in range(1, DB_COUNT + 1):
@@ -225,61 +1782,89 @@ def seed_pg_variant(name, host, port):
             if not cur.fetchone():
                 cur.execute(f'CREATE DATABASE "{dbn}"')
         cur.close()
+        conn.autocommit = False
+        METRICS.event("ddl", _time.perf_counter() - t0, step="create_dbs")
     finally:
-        conn.close()
+        pool.release((host, port, "postgres"), conn)
 
-    # --- Peuplement ---
+    # --- Schémas (dataset partagé par les 4 variantes) + découpage en unités ---
+    ds = load_dataset("pg")
+    schemas = {}
+    db_index = {}
+    units = []
     for i in range(1, DB_COUNT + 1):
         dbn = f"pg_{name}_{i}"
-        with pg_conn(host, port, dbn) as conn:
+        db_index[dbn] = i
+        conn = connect(dbn)
+        try:
+            t0 = _time.perf_counter()
             cur = conn.cursor()
-            schema = gen_schema("pg")
+            done = load_checkpoints(cur, ds.key)
+            schema = schemas[dbn] = ds.schema(i)
+            db_units = []
             for t in schema:
+                existed = table_exists(cur, t["name"], "'public'")
                 cols_sql = []
                 for col, typ in t["cols"]:
                     if col == "id" and typ == "SERIAL":
-                        cols_sql.append("id SERIAL PRIMARY KEY")
+                        # fast load : clé primaire construite après le chargement
+                        cols_sql.append("id SERIAL" if SEED_FAST_LOAD else "id SERIAL PRIMARY KEY")
                     else:
                         cols_sql.append(f"{col} {typ}")
+                create = "CREATE UNLOGGED TABLE" if SEED_FAST_LOAD else "CREATE TABLE"
                 cur.execute(
-                    f'CREATE TABLE IF NOT EXISTS "{t["name"]}" ({", ".join(cols_sql)});'
+                    f'{create} IF NOT EXISTS "{t["name"]}" ({", ".join(cols_sql)});'
                 )
+                if existed:
+                    purge_unfinished(cur, f'"{t["name"]}"', t["name"], ds.key)
+                plan = pg_row_plan(t["name"], [c for c, _ in t["cols"]], ["int4"] + t["kinds"])
+                db_units += split_units(dbn, plan, t["rows"], SEED_CHUNK_ROWS)
             conn.commit()
+            METRICS.event("ddl", _time.perf_counter() - t0, step="create_tables", db=dbn)
+            units += pending_units(db_units, done, f"PG:{name}:{dbn}")
+        finally:
+            pool.release((host, port, dbn), conn)
+
+    # --- Peuplement parallèle ---
+    print(
+        f"[PG:{name}] {len(units)} unités, workers={SEED_WORKERS}, mode={PG_LOAD_MODE}"
+        f"{', fast load' if SEED_FAST_LOAD else ''}",
+        flush=True,
+    )
+    with METRICS.timer("load", units=len(units)):
+        run_units(
+            f"PG:{name}",
+            interleave_units(units),
+            lambda dbn: pg_load_session(connect(dbn)),
+            lambda conn, u: pg_write_unit(
+                conn,
+                u,
+                METRICS.metered(ds.rows(db_index[u.db], u.table, u.start, u.count)),
+                ds.key,
+            ),
+            release=lambda conn, dbn: pool.release((host, port, dbn), conn),
+        )
 
+    # --- Séquences recalées (+ clés, LOGGED, ANALYZE en fast load), puis ref_id ---
+    for dbn, schema in schemas.items():
+        conn = connect(dbn)
+        try:
+            t0 = _time.perf_counter()
+            cur = conn.cursor()
             for t in schema:
-                cols = [c for c, _ in t["cols"] if c != "id"]
-                placeholders = ", ".join(["%s"] * len(cols))
-                for _ in range(RECORDS_PER_DB):
-                    row = []
-                    for c, typ in [x for x in t["cols"] if x[0] != "id"]:
-                        u = typ.upper()
-                        if "INT" in u and "TINYINT" not in u:
-                            row.append(random.randint(0, 1_000_000))
-                        elif any(
-                            k in u
-                            for k in ("DOUBLE", "DECIMAL", "NUMERIC", "REAL", "FLOAT")
-                        ):
-                            row.append(random.uniform(0, 10_000))
-                        elif "BOOLEAN" in u:
-                            row.append(random.choice([True, False]))
-                        elif u == "DATE":
-                            row.append(fake.date_object())
-                        elif "TIMESTAMP" in u:
-                            row.append(fake.date_time())
-                        elif "JSON" in u:
-                            row.append(Json(fake.pydict(5, True, True)))
-                        elif "BYTEA" in u:
-                            row.append(os.urandom(32))
-                        else:
-                            row.append(fake.text(80))
-                    cur.execute(
-                        f'INSERT INTO "{t["name"]}" ({", ".join(cols)}) VALUES ({placeholders})',
-                        row,
-                    )
+                pg_finalize_table(cur, t["name"])
+                conn.commit()
+            pg_add_refs(cur, schema)
             conn.commit()
-        print(f"[PG:{name}] Seeded {dbn}")
+            METRICS.event("finalize", _time.perf_counter() - t0, db=dbn)
+        finally:
+            pool.release((host, port, dbn), conn)
+        print(f"[PG:{name}] Seeded {dbn} (mode={PG_LOAD_MODE})")
 
-def mysql_conn(host, port, dbname=None, root_pw_env="MYSQL_ROOT_PASSWORD"):
+
+def mysql_conn(
+    host, port, dbname=None, root_pw_env="MYSQL_ROOT_PASSWORD", local_infile=False
+):
     hostname = host.lower()
 
     is_client_tunnel = (
@@ -297,17 +1882,22 @@ def mysql_conn(host, port, dbname=None, root_pw_env="MYSQL_ROOT_PASSWORD"):
         )
         needs_mtls = hostname.endswith(("-mtls", "-pkcs11")) or ("pkcs11" in hostname)
 
-    ssl_params = None
+    # contexte construit ici (et non un dict ssl) : poignée TLS chronométrée et
+    # session réutilisée d'une connexion à l'autre
+    ssl_ctx = None
     if needs_tls:
-        ssl_params = {"ca": TLS_CA_FILE}
-        if needs_mtls:
-            ssl_params.update({"cert": TLS_CLIENT_CERT, "key": TLS_CLIENT_KEY})
+        ssl_ctx = shared_ssl_context(
+            TLS_CA_FILE,
+            TLS_CLIENT_CERT if needs_mtls else None,
+            TLS_CLIENT_KEY if needs_mtls else None,
+        )
 
     print(
         f"[MySQL] connecting to {host}:{port} db={dbname or '(none)'} "
-        f"tls={bool(ssl_params)} mtls={needs_mtls}",
+        f"tls={bool(ssl_ctx)} mtls={needs_mtls}",
         flush=True,
     )
+    t0 = _time.perf_counter()
 
     conn = pymysql.connect(
         host=host,
@@ -317,98 +1907,488 @@ def mysql_conn(host, port, dbname=None, root_pw_env="MYSQL_ROOT_PASSWORD"):
         or os.getenv("MYSQL_ROOT_PASSWORD")
         or "rootpwd",
         database=dbname,
-        ssl=ssl_params,
+        ssl=ssl_ctx,
         connect_timeout=5,
         read_timeout=60,
         write_timeout=60,
+        local_infile=local_infile,
+    )
+    METRICS.event(
+        "connect",
+        _time.perf_counter() - t0,
+        endpoint=f"{host}:{port}",
+        db=dbname,
+        tls=bool(ssl_ctx),
     )
     print(f"[MySQL] connected to {host}:{port} db={dbname or '(none)'}", flush=True)
     return conn
 
 
+def mysql_gen_value(kind):
+    if kind == "int":
+        return random.randint(0, 1_000_000)
+    if kind == "tinyint":
+        return random.randint(0, 1)
+    if kind == "double":
+        return random.uniform(0, 10_000)
+    if kind == "date":
+        return str(fake.date_object(end_datetime=SEED_NOW))
+    if kind == "timestamp":
+        return str(fake.date_time(end_datetime=SEED_NOW))
+    if kind == "json":
+        return rnd_json_obj()
+    if kind == "blob":
+        return random.randbytes(32)
+    return fake.text(_text_chars)
+
+
+class MeteredCursor(pymysql.cursors.Cursor):
+    """Curseur qui compte les octets de SQL envoyés (executemany compris)."""
+
+    bytes_sent = 0
+
+    def execute(self, query, args=None):
+        if args is not None:
+            query = self.mogrify(query, args)
+        if isinstance(query, str):
+            self.bytes_sent += len(query.encode("utf-8", "surrogateescape"))
+        else:
+            self.bytes_sent += len(query)
+        return super().execute(query)
+
+
+def mysql_insert_rows(cur, plan, rows):
+    """Ancien chemin : un INSERT (un aller-retour) par ligne."""
+    n = 0
+    for row in rows:
+        cur.execute(plan.stmt, row)
+        n += 1
+    return n
+
+
+def mysql_stmt_budget(cur):
+    """
+    Taille max (octets) d'un INSERT multi-lignes : sous max_allowed_packet
+    côté serveur, avec une marge pour l'en-tête du paquet.
+    """
+    if MYSQL_MAX_STMT_BYTES:
+        return MYSQL_MAX_STMT_BYTES
+    cur.execute("SELECT @@max_allowed_packet")
+    (packet,) = cur.fetchone()
+    return max(64 * 1024, int(packet) - 64 * 1024)
+
+
+def mysql_multirow_rows(conn, cur, plan, rows, max_stmt, commit=True):
+    """
+    INSERT multi-lignes via executemany : PyMySQL regroupe les VALUES en
+    instructions de taille <= max_stmt (voir mysql_stmt_budget).
+    Un commit par lot de MYSQL_BATCH_ROWS lignes (commit=False : laissé à l'appelant).
+    """
+    cur.max_stmt_length = max_stmt
+    n = 0
+    for batch in _batched(rows, MYSQL_BATCH_ROWS):
+        cur.executemany(plan.stmt, batch)
+        if commit:
+            conn.commit()
+        n += len(batch)
+    return n
+
+
+# --- LOAD DATA LOCAL INFILE (TSV, échappement par défaut de MySQL) ---
+_INFILE_ESCAPES = str.maketrans(
+    {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\0": "\\0"}
+)
+
+
+def _infile_int(v):
+    return str(int(v))
+
+
+def _infile_float(v):
+    return repr(float(v))
+
+
+def _infile_blob(v):
+    # converti côté serveur par UNHEX(@var) : pas d'octet brut dans le flux texte
+    return bytes(v).hex()
+
+
+def _infile_str(v):
+    return str(v).translate(_INFILE_ESCAPES)
+
+
+INFILE_ENCODERS = {
+    "int": _infile_int,
+    "tinyint": _infile_int,
+    "double": _infile_float,
+    "blob": _infile_blob,
+    "date": _infile_str,
+    "timestamp": _infile_str,
+    "json": _infile_str,
+    "text": _infile_str,
+}
+
+
+def infile_chunk(encoders, rows):
+    lines = [
+        "\t".join(["\\N" if v is None else enc(v) for enc, v in zip(encoders, row)])
+        for row in rows
+    ]
+    lines.append("")
+    return "\n".join(lines).encode("utf-8")
+
+
+def _release_fifo(path, feeder):
+    """Débloque l'écrivain si le serveur n'a jamais (ou pas entièrement) lu le FIFO."""
+    while feeder.is_alive():
+        try:
+            fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+        except OSError:
+            break
+        os.close(fd)
+        feeder.join(0.1)
+
+
+def mysql_infile_rows(conn, cur, plan, rows):
+    """
+    LOAD DATA LOCAL INFILE alimenté par un FIFO : un thread génère/encode les
+    lignes dans le tube pendant que PyMySQL les envoie, sans fichier sur disque.
+    """
+    tmpdir = tempfile.mkdtemp(prefix="seed-infile-")
+    path = os.path.join(tmpdir, f"{plan.table}.tsv")
+    os.mkfifo(path)
+    stmt = plan.stmt.replace("{path}", path)
+
+    errors = []
+    count = [0]
+    nbytes = [0]
+
+    def feed():
+        try:
+            with open(path, "wb") as f:
+                for batch in _batched(rows, MYSQL_BATCH_ROWS):
+                    chunk = infile_chunk(plan.encoders, batch)
+                    f.write(chunk)
+                    count[0] += len(batch)
+                    nbytes[0] += len(chunk)
+        except BrokenPipeError:
+            pass
+        except Exception as e:  # remonté au thread principal après le LOAD
+            errors.append(e)
+
+    feeder = threading.Thread(target=feed, name=f"infile-{plan.table}", daemon=True)
+    feeder.start()
+    try:
+        cur.execute(stmt)
+    finally:
+        _release_fifo(path, feeder)
+        feeder.join()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    if errors:
+        raise errors[0]
+    METRICS.unit_add(nbytes[0])
+    return count[0]
+
+
+def enable_local_infile(cur, label):
+    """MySQL 8 désactive local_infile côté serveur par défaut (MariaDB non)."""
+    try:
+        cur.execute("SET GLOBAL local_infile = 1")
+    except pymysql.MySQLError as e:
+        print(f"[{label}] SET GLOBAL local_infile ignoré: {e}", flush=True)
+
+
+def mysql_row_plan(table, cols, kinds, mode=None):
+    """
+    Compile le RowPlan d'une table pour MYSQL_LOAD_MODE (ou `mode`). En infile,
+    l'instruction garde un emplacement {path} pour le FIFO et les BLOB passent
+    en hexadécimal (SET col = UNHEX(@var)).
+    """
+    mode = mode or MYSQL_LOAD_MODE
+    if mode != "infile":
+        ph = ", ".join(["%s"] * len(cols))
+        stmt = f"INSERT INTO `{table}` ({', '.join(cols)}) VALUES ({ph})"
+        return RowPlan(table, tuple(cols), tuple(kinds), mode, stmt, None)
+    targets, sets = [], []
+    for c, k in zip(cols, kinds):
+        if k == "blob":
+            targets.append(f"@{c}")
+            sets.append(f"{c} = UNHEX(@{c})")
+        else:
+            targets.append(c)
+    stmt = (
+        f"LOAD DATA LOCAL INFILE '{{path}}' INTO TABLE `{table}` CHARACTER SET utf8mb4 "
+        "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+        f"({', '.join(targets)})"
+    )
+    if sets:
+        stmt += " SET " + ", ".join(sets)
+    encoders = tuple(INFILE_ENCODERS[k] for k in kinds)
+    return RowPlan(table, tuple(cols), tuple(kinds), mode, stmt, encoders)
+
+
+def mysql_write_unit(conn, unit, rows, max_stmt, key):
+    cur = conn.cursor(MeteredCursor)
+    try:
+        if unit.plan.mode == "insert":
+            mysql_insert_rows(cur, unit.plan, rows)
+        elif unit.plan.mode == "infile":
+            mysql_infile_rows(conn, cur, unit.plan, rows)
+        else:
+            mysql_multirow_rows(conn, cur, unit.plan, rows, max_stmt)
+        METRICS.unit_add(cur.bytes_sent)
+        mark_checkpoint(cur, key, unit)
+        conn.commit()
+    finally:
+        cur.close()
+
+
+def mysql_load_session(conn, fast):
+    """En fast load, contrôles d'unicité/FK coupés pour la session (rétablis pour finaliser)."""
+    if SEED_FAST_LOAD:
+        flag = 0 if fast else 1
+        with conn.cursor() as cur:
+            cur.execute(f"SET SESSION unique_checks = {flag}, foreign_key_checks = {flag}")
+    return conn
+
+
+def mysql_finalize_table(cur, table):
+    """Fast load : clé primaire/AUTO_INCREMENT créés après chargement, puis ANALYZE."""
+    cur.execute(
+        "SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() "
+        "AND table_name = %s AND index_name = 'PRIMARY'",
+        (table,),
+    )
+    if cur.fetchone() is None:
+        cur.execute(
+            f"ALTER TABLE `{table}` MODIFY id INT NOT NULL AUTO_INCREMENT, "
+            "ADD PRIMARY KEY (id)"
+        )
+    cur.execute(f"ANALYZE TABLE `{table}`")
+    cur.fetchall()
+
+
+def mysql_add_refs(cur, schema):
+    """SEED_REF_KEYS après chargement : index sur ref_id puis (fk) clé étrangère."""
+    if SEED_REF_KEYS == "none":
+        return
+    for t in schema:
+        parent = t.get("ref")
+        if not parent:
+            continue
+        table = t["name"]
+        cur.execute(
+            "SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() "
+            "AND table_name = %s AND index_name = %s",
+            (table, ref_index_name(table)),
+        )
+        if cur.fetchone() is None:
+            cur.execute(f"ALTER TABLE `{table}` ADD INDEX `{ref_index_name(table)}` (ref_id)")
+        if SEED_REF_KEYS != "fk":
+            continue
+        cur.execute(
+            "SELECT 1 FROM information_schema.table_constraints "
+            "WHERE constraint_schema = DATABASE() AND table_name = %s "
+            "AND constraint_name = %s",
+            (table, ref_fk_name(table)),
+        )
+        if cur.fetchone() is None:
+            cur.execute(
+                f"ALTER TABLE `{table}` ADD CONSTRAINT `{ref_fk_name(table)}` "
+                f"FOREIGN KEY (ref_id) REFERENCES `{parent}` (id)"
+            )
+
+
 def seed_mysql_like(label, host, port, root_pw_env, engine_key):
 
+    if MYSQL_LOAD_MODE not in ("multirow", "infile", "insert"):
+        raise RuntimeError(
+            f"MYSQL_LOAD_MODE={MYSQL_LOAD_MODE!r} inconnu (multirow | infile | insert)"
+        )
+    check_ref_keys()
+    pool = ConnectionPool(label)
+    try:
+        _seed_mysql_like(label, host, port, root_pw_env, engine_key, pool)
+    finally:
+        pool.close_all()
+
+
+def _seed_mysql_like(label, host, port, root_pw_env, engine_key, pool):
+    # Une seule famille de connexions par endpoint : on change de base avec
+    # select_db. local_infile est fixé à la connexion, donc pour toutes.
+    local_infile = MYSQL_LOAD_MODE == "infile"
+    endpoint = (host, port)
+
+    def open_conn():
+        return mysql_conn(host, port, None, root_pw_env, local_infile)
+
+    def connect(dbn):
+        conn = pool.acquire(endpoint, open_conn)
+        conn.select_db(dbn)
+        return conn
+
+    def release(conn, dbn):
+        try:
+            mysql_load_session(conn, fast=False)
+        except pymysql.MySQLError:
+            pass  # connexion hors d'usage : le pool la fermera
+        pool.release(endpoint, conn)
+
     start = _time.perf_counter()
     print(f"[{label}] phase=CreateDBs start", flush=True)
 
-    with mysql_conn(host, port, None, root_pw_env) as conn:
+    with pool.connection(endpoint, open_conn) as conn:
         cur = conn.cursor()
+        if local_infile:
+            enable_local_infile(cur, label)
+        max_stmt = mysql_stmt_budget(cur)
         for i in range(1, DB_COUNT + 1):
             dbn = f"{label}_{i}"
             cur.execute(f"CREATE DATABASE IF NOT EXISTS {dbn};")
         conn.commit()
+    METRICS.event("ddl", _time.perf_counter() - start, step="create_dbs")
     print(
         f"[{label}] phase=CreateDBs done in {(_time.perf_counter()-start):.2f}s",
         flush=True,
     )
 
-    for i in range(1, DB_COUNT + 1):
-        dbn = f"{label}_{i}"
-        t0 = _time.perf_counter()
-        print(f"[{label}] phase=SeedDB db={dbn} start", flush=True)
-        with mysql_conn(host, port, dbn, root_pw_env) as conn:
-            cur = conn.cursor()
-            schema = gen_schema(engine_key)
-
-            def map_type(u: str) -> str:
-                return (
-                    u.upper()
-                    .replace("JSONB", "JSON")
-                    .replace("BYTEA", "BLOB")
-                    .replace("DOUBLE PRECISION", "DOUBLE")
-                    .replace("BOOLEAN", "TINYINT(1)")
-                )
-
+    t0 = _time.perf_counter()
+    print(f"[{label}] phase=CreateTables start", flush=True)
+    ds = load_dataset(engine_key)
+    units = []
+    dbs = [f"{label}_{i}" for i in range(1, DB_COUNT + 1)]
+    db_index = {dbn: i for i, dbn in enumerate(dbs, start=1)}
+    with pool.connection(endpoint, open_conn) as conn:
+        cur = conn.cursor()
+        for dbn in dbs:
+            conn.select_db(dbn)
+            done = load_checkpoints(cur, ds.key)
+            schema = ds.schema(db_index[dbn])
+            db_units = []
             for t in schema:
-                cols_sql = ["id INT AUTO_INCREMENT PRIMARY KEY"]
+                existed = table_exists(cur, t["name"], "DATABASE()")
+                # fast load : pas de clé pendant le chargement (ajoutée ensuite)
+                cols_sql = [
+                    "id INT NOT NULL" if SEED_FAST_LOAD else "id INT AUTO_INCREMENT PRIMARY KEY"
+                ]
                 for col, typ in t["cols"]:
                     if col == "id":
                         continue
-                    cols_sql.append(f"{col} {map_type(typ)}")
+                    cols_sql.append(f"{col} {typ}")
                 cur.execute(
                     f"CREATE TABLE IF NOT EXISTS `{t['name']}` ({', '.join(cols_sql)});"
                 )
+                if existed:
+                    purge_unfinished(cur, f"`{t['name']}`", t["name"], ds.key)
+                plan = mysql_row_plan(t["name"], [c for c, _ in t["cols"]], ["int"] + t["kinds"])
+                db_units += split_units(dbn, plan, t["rows"], SEED_CHUNK_ROWS)
             conn.commit()
-            ins = 0
-            for t in schema:
-                cols = [c for c, _ in t["cols"] if c != "id"]
-                ph = ", ".join(["%s"] * len(cols))
-                for _ in range(RECORDS_PER_DB):
-                    row = []
-                    for c, typ in [x for x in t["cols"] if x[0] != "id"]:
-                        u = typ.upper()
-                        if "INT" in u and "TINYINT" not in u:
-                            row.append(random.randint(0, 1_000_000))
-                        elif "TINYINT" in u:
-                            row.append(random.randint(0, 1))
-                        elif any(k in u for k in ("DOUBLE", "DECIMAL", "FLOAT")):
-                            row.append(random.uniform(0, 10_000))
-                        elif u == "DATE":
-                            row.append(str(fake.date_object()))
-                        elif "TIMESTAMP" in u or "DATETIME" in u:
-                            row.append(str(fake.date_time()))
-                        elif "JSON" in u:
-                            row.append(rnd_json_obj())
-                        elif "BLOB" in u:
-                            row.append(os.urandom(32))
-                        else:
-                            row.append(fake.text(80))
-                    cur.execute(
-                        f"INSERT INTO `{t['name']}` ({', '.join(cols)}) VALUES ({ph})",
-                        row,
-                    )
-                    ins += 1
-                    if ins % 250 == 0:
-                        print(f"[{label}] db={dbn} inserts={ins}", flush=True)
-                conn.commit()
-            print(
-                f"[{label}] phase=SeedDB db={dbn} done in {(_time.perf_counter()-t0):.2f}s (rows={ins})",
-                flush=True,
-            )
+            units += pending_units(db_units, done, f"{label}:{dbn}")
+    METRICS.event("ddl", _time.perf_counter() - t0, step="create_tables")
+    print(
+        f"[{label}] phase=CreateTables done in {(_time.perf_counter()-t0):.2f}s "
+        f"(units={len(units)})",
+        flush=True,
+    )
+
+    t0 = _time.perf_counter()
+    print(
+        f"[{label}] phase=Load start (workers={SEED_WORKERS}, mode={MYSQL_LOAD_MODE})",
+        flush=True,
+    )
+    run_units(
+        label,
+        interleave_units(units),
+        lambda dbn: mysql_load_session(connect(dbn), fast=True),
+        lambda conn, u: mysql_write_unit(
+            conn,
+            u,
+            METRICS.metered(ds.rows(db_index[u.db], u.table, u.start, u.count)),
+            max_stmt,
+            ds.key,
+        ),
+        use_db=lambda conn, dbn: conn.select_db(dbn),
+        release=release,
+    )
+    METRICS.event("load", _time.perf_counter() - t0, units=len(units))
+    print(
+        f"[{label}] phase=Load done in {(_time.perf_counter()-t0):.2f}s "
+        f"(rows={sum(u.count for u in units)}, mode={MYSQL_LOAD_MODE})",
+        flush=True,
+    )
+
+    if SEED_FAST_LOAD or SEED_REF_KEYS != "none":
+        t0 = _time.perf_counter()
+        print(f"[{label}] phase=Finalize start", flush=True)
+        with pool.connection(endpoint, open_conn) as conn:
+            cur = conn.cursor()
+            for dbn in dbs:
+                conn.select_db(dbn)
+                schema = ds.schema(db_index[dbn])
+                if SEED_FAST_LOAD:
+                    for t in schema:
+                        mysql_finalize_table(cur, t["name"])
+                mysql_add_refs(cur, schema)
+            conn.commit()
+        METRICS.event("finalize", _time.perf_counter() - t0)
+        print(
+            f"[{label}] phase=Finalize done in {(_time.perf_counter()-t0):.2f}s",
+            flush=True,
+        )
+    for dbn in dbs:
         print(f"[{label}] Seeded {dbn}")
 
 
 # ---------- MongoDB ----------
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    """
+    PyMongo gère son propre pool : chaque connexion qu'il ouvre (donc chaque
+    poignée TLS) est remontée comme un événement connect dans METRICS.
+    """
+
+    def __init__(self, endpoint, tls):
+        self.endpoint = endpoint
+        self.tls = tls
+
+    def connection_ready(self, event):
+        METRICS.event(
+            "connect",
+            getattr(event, "duration", None) or 0.0,
+            endpoint=self.endpoint,
+            tls=self.tls,
+        )
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        pass
+
+    def connection_checked_out(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+
 def mongo_client(host, port, mtls=False):
     uri = (
         f"mongodb://{os.getenv('MONGO_INITDB_ROOT_USERNAME','admin')}:"
@@ -434,165 +2414,426 @@ def mongo_client(host, port, mtls=False):
                     "Génère un PEM (cert+key concaténés) et monte-le dans le seeder."
                 )
             kwargs["tlsCertificateKeyFile"] = pem
+    kwargs["event_listeners"] = [MongoPoolListener(f"{host}:{port}", needs_tls)]
     try:
+        t0 = _time.perf_counter()
         cli = MongoClient(uri, **kwargs)
         # Force la résolution immédiate sinon PyMongo diffère la sélection
         cli.admin.command("ping")
+        METRICS.event("client", _time.perf_counter() - t0, endpoint=f"{host}:{port}")
         return cli
     except ServerSelectionTimeoutError as e:
         print(f"[Mongo] ServerSelectionTimeoutError host={host}:{port} -> {e}", flush=True)
         raise
 
+def mongo_tls_probe(label, host, port, mtls=False):
+    """Poignée TLS de référence vers un endpoint Mongo (TLS dès la connexion, cf. tls_probe)."""
+    if not host.endswith(("tls", "mtls")):
+        return
+    ctx = client_ssl_context(TLS_CA_FILE, TLS_CLIENT_PEM if mtls else None)
+    tls_probe(label, host, port, ctx)
+
+
+def insert_ignoring_duplicates(coll, docs):
+    """
+    insert_many non ordonné ; les _id déjà présents (unité interrompue puis
+    reprise) sont ignorés, toute autre erreur remonte.
+    """
+    try:
+        coll.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+            raise
+        if e.details.get("writeConcernErrors"):
+            raise
+
+
+def mongo_write_concern():
+    w = MONGO_WRITE_CONCERN
+    return WriteConcern(w=int(w) if w.isdigit() else w, j=MONGO_JOURNAL)
+
+
+def mongo_fsync(client, name):
+    # fsync doit être exécuté sur la DB admin (et peut être refusé). On ignore proprement si non autorisé.
+    try:
+        client.admin.command({"fsync": 1})
+    except OperationFailure as e:
+        print(f"[Mongo:{name}] fsync ignoré: {e.details.get('errmsg', str(e))}", flush=True)
+
+
+def mongo_row_plan(t):
+    """RowPlan d'une collection : les champs des documents, sans instruction ni encodeur."""
+    fields = tuple(f for f, _ in t["cols"])
+    return RowPlan(t["name"], fields, tuple(t["kinds"]), "insert_many", None, None)
+
+
+def mongo_docs(ds, i, u):
+    cols = ds.columns(i, u.table, u.start, u.count)
+    return [
+        dict(zip(u.plan.cols, vals), _id=doc_id)
+        for doc_id, vals in zip(range(u.start, u.start + u.count), zip(*cols))
+    ]
+
+
+# --- Chemin RawBSON : encodage BSON dans des processus séparés ---
+BSON_MAX_DOC_BYTES = 16 * 1024 * 1024
+BSON_MAX_MESSAGE_BYTES = 48 * 1000 * 1000
+_encoder_datasets = {}
+
+
+def encode_unit_bson(ds_path, i, unit):
+    """
+    (Processus encodeur) Génère les documents d'une unité et les encode en
+    BSON, regroupés en lots de MONGO_RAW_BATCH_BYTES au plus : renvoie une
+    liste de (blob, offsets) à découper en RawBSONDocument côté writer.
+    """
+    ds = _encoder_datasets.get(ds_path)
+    if ds is None:
+        ds = _encoder_datasets[ds_path] = Dataset(ds_path)
+    limit = min(MONGO_RAW_BATCH_BYTES, BSON_MAX_MESSAGE_BYTES)
+    batches, parts, offsets, size = [], [], [0], 0
+    for doc in mongo_docs(ds, i, unit):
+        raw = bson.encode(doc)
+        if len(raw) > BSON_MAX_DOC_BYTES:
+            raise ValueError(f"document {doc['_id']} > 16MB ({len(raw)} octets)")
+        if parts and size + len(raw) > limit:
+            batches.append((b"".join(parts), offsets))
+            parts, offsets, size = [], [0], 0
+        parts.append(raw)
+        size += len(raw)
+        offsets.append(size)
+    if parts:
+        batches.append((b"".join(parts), offsets))
+    return batches
+
+
+def raw_bson_batches(encoded):
+    return [
+        [RawBSONDocument(blob[o:p]) for o, p in zip(offsets, offsets[1:])]
+        for blob, offsets in encoded
+    ]
+
+
+def encoded_units(pool, ds_path, i, units, depth):
+    """
+    Soumet l'encodage des unités en avance (au plus `depth` en vol), dans
+    l'ordre. Le temps compté en génération est l'attente des encodeurs.
+    """
+    pending = collections.deque()
+
+    def ready():
+        u0, fut = pending.popleft()
+        t0 = _time.perf_counter()
+        encoded = fut.result()
+        batches = raw_bson_batches(encoded)
+        METRICS.table_add(
+            u0.db,
+            u0.table,
+            generate_s=_time.perf_counter() - t0,
+            bytes=sum(len(blob) for blob, _ in encoded),
+        )
+        return u0, batches
+
+    for u in units:
+        pending.append((u, pool.submit(encode_unit_bson, ds_path, i, u)))
+        if len(pending) >= depth:
+            yield ready()
+    while pending:
+        yield ready()
+
+
+def doc_units(ds, i, units):
+    """Paquets (unité, [documents]) construits dans le thread producteur."""
+    for u in units:
+        t0 = _time.perf_counter()
+        docs = mongo_docs(ds, i, u)
+        METRICS.table_add(u.db, u.table, generate_s=_time.perf_counter() - t0)
+        # Estimation : taille BSON du premier document × nombre de documents.
+        # Le pilote encode déjà chaque document dans insert_many ; tout
+        # réencoder ici doublerait le travail du thread producteur.
+        if docs:
+            METRICS.table_add(u.db, u.table, bytes=len(bson.encode(docs[0])) * len(docs))
+        yield u, [docs]
+
+
+def mongo_stream_load(label, client, items, key):
+    """
+    Producteur/consommateurs : le thread appelant produit les paquets
+    (unité, [lots de documents]) de `items` dans une file bornée à
+    MONGO_QUEUE_DEPTH, MONGO_WRITERS threads les insèrent (insert_many non
+    ordonné) et marquent l'unité terminée. La mémoire reste bornée quel que
+    soit la taille des collections.
+    """
+    q = queue.Queue(maxsize=max(1, MONGO_QUEUE_DEPTH))
+    stop = threading.Event()
+    errors = []
+    wc = mongo_write_concern()
+
+    def writer():
+        while True:
+            item = q.get()
+            if item is None:
+                return
+            if stop.is_set():
+                continue  # on vide la file pour ne pas bloquer le producteur
+            unit, batches = item
+            try:
+                db = client[unit.db]
+                coll = db.get_collection(unit.table, write_concern=wc)
+                t0 = _time.perf_counter()
+                for docs in batches:
+                    insert_ignoring_duplicates(coll, docs)
+                METRICS.table_add(
+                    unit.db,
+                    unit.table,
+                    rows=unit.count,
+                    write_s=_time.perf_counter() - t0,
+                )
+                db[CHECKPOINT_TABLE].insert_one(
+                    {
+                        "_id": f"{key}:{unit.table}:{unit.start}",
+                        "dataset": key,
+                        "tbl": unit.table,
+                        "start_id": unit.start,
+                        "nrows": unit.count,
+                    }
+                )
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+                traceback.print_exc()
+
+    threads = [
+        threading.Thread(target=writer, name=f"{label}-w{n}", daemon=True)
+        for n in range(max(1, MONGO_WRITERS))
+    ]
+    for th in threads:
+        th.start()
+    try:
+        for item in items:
+            if stop.is_set():
+                break
+            q.put(item)
+    finally:
+        for _ in threads:
+            q.put(None)
+        for th in threads:
+            th.join()
+    if errors:
+        raise errors[0]
+
+
 def seed_mongo_variant(name, host, port, mtls=False):
+    if MONGO_FSYNC not in ("end", "db", "off"):
+        raise RuntimeError(f"MONGO_FSYNC={MONGO_FSYNC!r} inconnu (end | db | off)")
+
+    ds = load_dataset("mongo")
+    encoders = None
+    if MONGO_RAW_BSON:
+        # spawn : pas de fork d'un processus qui a déjà des threads (writers, pymongo)
+        encoders = ProcessPoolExecutor(
+            max_workers=MONGO_ENCODERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    label = f"Mongo:{name}"
+    mongo_tls_probe(label, host, port, mtls=mtls)
     client = mongo_client(host, port, mtls=mtls)
     try:
         for i in range(1, DB_COUNT + 1):
             dbn = f"mg_{name}_{i}"
             db = client[dbn]
-            coln = random.randint(MIN_TABLES, MAX_TABLES)
-            for j in range(1, coln + 1):
-                cname = f"{rnd_word()}_{j}"
-                # Force la création explicite
-                if cname not in db.list_collection_names():
-                    db.create_collection(cname)
-                coll = db[cname]
-
-                docs = []
-                for _ in range(RECORDS_PER_DB):
-                    docs.append(
-                        {
-                            "name": fake.name(),
-                            "email": fake.email(),
-                            "qty": random.randint(1, 50),
-                            "price": round(random.uniform(1, 9999), 2),
-                            "ts": str(fake.date_time()),
-                            "tags": [rnd_word(5) for _ in range(random.randint(1, 5))],
-                            "opt": random.choice([None, fake.sentence(), fake.url()]),
-                        }
-                    )
-                coll.insert_many(docs, ordered=False)
-                written = coll.estimated_document_count()
-                if written < RECORDS_PER_DB:
-                    raise RuntimeError(
-                        f"[Mongo:{name}] {dbn}.{cname} n'a que {written} docs (< {RECORDS_PER_DB})"
-                    )
+            schema = ds.schema(i)
+            done = {
+                (d["tbl"], d["start_id"])
+                for d in db[CHECKPOINT_TABLE].find(
+                    {"dataset": ds.key}, {"tbl": 1, "start_id": 1}
+                )
+            }
+            # Création explicite ; une seule interrogation du catalogue par base
+            t0 = _time.perf_counter()
+            existing = set(db.list_collection_names())
+            units = []
+            for t in schema:
+                if t["name"] not in existing:
+                    db.create_collection(t["name"])
+                units += split_units(dbn, mongo_row_plan(t), t["rows"], SEED_CHUNK_ROWS)
+            METRICS.event("ddl", _time.perf_counter() - t0, step="create_collections", db=dbn)
+            units = pending_units(units, done, f"{label}:{dbn}")
 
-            # fsync doit être exécuté sur la DB admin (et peut être refusé). On ignore proprement si non autorisé.
-            try:
-                client.admin.command({"fsync": 1})
-            except OperationFailure as e:
-                print(f"[Mongo:{name}] fsync ignoré: {e.details.get('errmsg', str(e))}", flush=True)
+            if encoders:
+                items = encoded_units(
+                    encoders, ds.path, i, units, max(1, MONGO_QUEUE_DEPTH)
+                )
+            else:
+                items = doc_units(ds, i, units)
+            with METRICS.timer("load", db=dbn, units=len(units)):
+                mongo_stream_load(label, client, items, ds.key)
+
+            # w=0 : écritures non acquittées, le comptage n'a pas de sens ici
+            if MONGO_WRITE_CONCERN != "0":
+                for t in schema:
+                    written = db[t["name"]].estimated_document_count()
+                    if written < t["rows"]:
+                        raise RuntimeError(
+                            f"[{label}] {dbn}.{t['name']} n'a que {written} docs (< {t['rows']})"
+                        )
+
+            if MONGO_FSYNC == "db":
+                with METRICS.timer("fsync", db=dbn):
+                    mongo_fsync(client, name)
 
-            print(f"[Mongo:{name}] Seeded {dbn} (collections={coln})")
+            print(f"[{label}] Seeded {dbn} (collections={len(schema)})")
+
+        if MONGO_FSYNC == "end":
+            with METRICS.timer("fsync"):
+                mongo_fsync(client, name)
 
         # Inventaire final
         try:
             dbs = [d["name"] for d in client.admin.command("listDatabases")["databases"]]
-            print(f"[Mongo:{name}] listDatabases -> {dbs}", flush=True)
+            print(f"[{label}] listDatabases -> {dbs}", flush=True)
         except Exception as e:
-            print(f"[Mongo:{name}] listDatabases error: {e}", flush=True)
+            print(f"[{label}] listDatabases error: {e}", flush=True)
     finally:
         client.close()
+        if encoders:
+            encoders.shutdown(cancel_futures=True)
 
 
-def main():
-    print("Seeder started, waiting for DBs...", flush=True)
-    time.sleep(6)
+VARIANTS = ("mdp", "tls", "mtls", "pkcs11")
 
-    # Montre au minimum les knobs + cibles MySQL (ajoute PG/Maria/Mongo si utile)
-    dump_env(prefix_filters=["DB_", "POSTGRES_", "MYSQL_", "MARIADB_", "MONGO_"])
+
+def seed_targets():
+    """
+    Liste des cibles à peupler : (label, fonction, args, kwargs).
+    Un moteur n'est retenu que si son hôte mdp est défini (comme avant).
+    """
+    targets = []
     # PostgreSQL
     if os.getenv("PG_MDP_HOST"):
-        seed_pg_variant("mdp", os.getenv("PG_MDP_HOST"), os.getenv("PG_MDP_PORT"))
-        seed_pg_variant("tls", os.getenv("PG_TLS_HOST"), os.getenv("PG_TLS_PORT"))
-        seed_pg_variant("mtls", os.getenv("PG_MTLS_HOST"), os.getenv("PG_MTLS_PORT"))
-        seed_pg_variant(
-            "pkcs11", os.getenv("PG_PKCS11_HOST"), os.getenv("PG_PKCS11_PORT")
-        )
-
-    # MySQL
-    if os.getenv("MYSQL_MDP_HOST"):
-        seed_mysql_like(
-            "mysql_mdp",
-            os.getenv("MYSQL_MDP_HOST"),
-            os.getenv("MYSQL_MDP_PORT"),
-            "MYSQL_ROOT_PASSWORD",
-            "mysql",
-        )
-        seed_mysql_like(
-            "mysql_tls",
-            os.getenv("MYSQL_TLS_HOST"),
-            os.getenv("MYSQL_TLS_PORT"),
-            "MYSQL_ROOT_PASSWORD",
-            "mysql",
-        )
-        seed_mysql_like(
-            "mysql_mtls",
-            os.getenv("MYSQL_MTLS_HOST"),
-            os.getenv("MYSQL_MTLS_PORT"),
-            "MYSQL_ROOT_PASSWORD",
-            "mysql",
-        )
-        seed_mysql_like(
-            "mysql_pkcs11",
-            os.getenv("MYSQL_PKCS11_HOST"),
-            os.getenv("MYSQL_PKCS11_PORT"),
-            "MYSQL_ROOT_PASSWORD",
-            "mysql",
-        )
+        for v in VARIANTS:
+            V = v.upper()
+            targets.append(
+                (
+                    f"pg_{v}",
+                    seed_pg_variant,
+                    (v, os.getenv(f"PG_{V}_HOST"), os.getenv(f"PG_{V}_PORT")),
+                    {},
+                )
+            )
 
-    # MariaDB
-    if os.getenv("MARIADB_MDP_HOST"):
-        seed_mysql_like(
-            "mariadb_mdp",
-            os.getenv("MARIADB_MDP_HOST"),
-            os.getenv("MARIADB_MDP_PORT"),
-            "MARIADB_ROOT_PASSWORD",
-            "maria",
-        )
-        seed_mysql_like(
-            "mariadb_tls",
-            os.getenv("MARIADB_TLS_HOST"),
-            os.getenv("MARIADB_TLS_PORT"),
-            "MARIADB_ROOT_PASSWORD",
-            "maria",
-        )
-        seed_mysql_like(
-            "mariadb_mtls",
-            os.getenv("MARIADB_MTLS_HOST"),
-            os.getenv("MARIADB_MTLS_PORT"),
-            "MARIADB_ROOT_PASSWORD",
-            "maria",
-        )
-        seed_mysql_like(
-            "mariadb_pkcs11",
-            os.getenv("MARIADB_PKCS11_HOST"),
-            os.getenv("MARIADB_PKCS11_PORT"),
-            "MARIADB_ROOT_PASSWORD",
-            "maria",
-        )
+    # MySQL / MariaDB
+    for prefix, label, engine_key in (
+        ("MYSQL", "mysql", "mysql"),
+        ("MARIADB", "mariadb", "maria"),
+    ):
+        if not os.getenv(f"{prefix}_MDP_HOST"):
+            continue
+        for v in VARIANTS:
+            V = v.upper()
+            targets.append(
+                (
+                    f"{label}_{v}",
+                    seed_mysql_like,
+                    (
+                        f"{label}_{v}",
+                        os.getenv(f"{prefix}_{V}_HOST"),
+                        os.getenv(f"{prefix}_{V}_PORT"),
+                        f"{prefix}_ROOT_PASSWORD",
+                        engine_key,
+                    ),
+                    {},
+                )
+            )
 
-    # Mongo
+    # Mongo (mtls + pkcs11 présentent un certificat client)
     if os.getenv("MONGO_MDP_HOST"):
-        seed_mongo_variant(
-            "mdp", os.getenv("MONGO_MDP_HOST"), os.getenv("MONGO_MDP_PORT"), mtls=False
-        )
-        seed_mongo_variant(
-            "tls", os.getenv("MONGO_TLS_HOST"), os.getenv("MONGO_TLS_PORT"), mtls=False
-        )
-        seed_mongo_variant(
-            "mtls",
-            os.getenv("MONGO_MTLS_HOST"),
-            os.getenv("MONGO_MTLS_PORT"),
-            mtls=True,
-        )
-        seed_mongo_variant(
-            "pkcs11",
-            os.getenv("MONGO_PKCS11_HOST"),
-            os.getenv("MONGO_PKCS11_PORT"),
-            mtls=True,
+        for v in VARIANTS:
+            V = v.upper()
+            targets.append(
+                (
+                    f"mongo_{v}",
+                    seed_mongo_variant,
+                    (v, os.getenv(f"MONGO_{V}_HOST"), os.getenv(f"MONGO_{V}_PORT")),
+                    {"mtls": v in ("mtls", "pkcs11")},
+                )
+            )
+    return targets
+
+
+def run_target(label, fn, args, kwargs):
+    """
+    Exécute une cible et renvoie (label, ok, durée, erreur, métriques) : aucune
+    exception ne sort d'ici, une cible en échec n'interrompt pas les autres.
+    """
+    METRICS.reset(label)
+    t0 = _time.perf_counter()
+    try:
+        fn(*args, **kwargs)
+        return label, True, _time.perf_counter() - t0, "", METRICS.snapshot()
+    except Exception as e:
+        traceback.print_exc()
+        return (
+            label,
+            False,
+            _time.perf_counter() - t0,
+            f"{type(e).__name__}: {e}",
+            METRICS.snapshot(),
         )
 
 
+def run_targets(targets, concurrency):
+    """Peuple les cibles en parallèle (pool de processus), au plus `concurrency` à la fois."""
+    if concurrency <= 1:
+        return [run_target(*t) for t in targets]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=min(concurrency, len(targets))) as pool:
+        futures = {pool.submit(run_target, *t): t[0] for t in targets}
+        for fut in as_completed(futures):
+            label = futures[fut]
+            try:
+                results.append(fut.result())
+            except Exception as e:  # worker mort (BrokenProcessPool, OOM...)
+                results.append((label, False, 0.0, f"{type(e).__name__}: {e}", []))
+            print(f"[scheduler] {label} terminé", flush=True)
+    order = {t[0]: i for i, t in enumerate(targets)}
+    return sorted(results, key=lambda r: order[r[0]])
+
+
+def print_summary(results):
+    width = max([len(r[0]) for r in results] + [6])
+    print("\n=== SEED SUMMARY ===")
+    print(f"{'target':<{width}}  status  duration  error")
+    for label, ok, elapsed, err, _ in results:
+        status = "ok" if ok else "FAILED"
+        print(f"{label:<{width}}  {status:<6}  {elapsed:7.1f}s  {err}")
+    failed = sum(1 for r in results if not r[1])
+    print(f"=== {len(results) - failed} ok, {failed} failed ===\n", flush=True)
+
+
+def main():
+    print("Seeder started, waiting for DBs...", flush=True)
+    time.sleep(6)
+
+    # Montre au minimum les knobs + cibles MySQL (ajoute PG/Maria/Mongo si utile)
+    dump_env(
+        prefix_filters=["DB_", "POSTGRES_", "MYSQL_", "MARIADB_", "MONGO_", "SEED_", "TARGET_"]
+    )
+
+    targets = seed_targets()
+    if not targets:
+        print("Aucune cible configurée (*_MDP_HOST).", flush=True)
+        return
+    print(
+        f"[scheduler] {len(targets)} cibles, SEED_CONCURRENCY={SEED_CONCURRENCY}",
+        flush=True,
+    )
+    results = run_targets(targets, SEED_CONCURRENCY)
+    print_summary(results)
+    export_metrics(results)
+    if not all(r[1] for r in results):
+        sys.exit(1)
+
+
 if __name__ == "__main__":
     main()
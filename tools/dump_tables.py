@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Lister & dumper (JSON/CSV/NDJSON) pour tables/collections sélectionnées.
+Lister & dumper (JSON/CSV/NDJSON, Parquet/Arrow, BSON brut pour Mongo) pour tables/collections sélectionnées.
 
 Exemples :
   # Lister bases découvertes
@@ -14,15 +14,41 @@ Exemples :
 
   # Dumper collections en NDJSON
   python tools/dump_tables.py --engine mongo --variant pkcs11 --db ma_base --collections c1,c2 --fmt ndjson --out ./dumps
+
+  # Tout dumper (moteurs × variantes × bases × tables) dans un seul processus
+  python tools/dump_tables.py --all --jobs 8 --fmt csv --out ./dumps
+
+  # Grosse table lue en 8 plages d'id parallèles, recollées à la fin
+  python tools/dump_tables.py --engine pg --variant mdp --db ma_base --tables t1 --parts 8
+
+  # Seulement les lignes ajoutées depuis le run précédent (deltas + manifeste)
+  python tools/dump_tables.py --all --incremental --out ./dumps
 """
+import collections
 import csv
+import datetime
+import functools
+import glob
+import gzip
+import hashlib
+import importlib.util
+import io
+import itertools
 import json
 import os
 import re
+import shutil
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 
 import psycopg2
 import pymysql
+import pymysql.cursors
+from bson import ObjectId, json_util
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
 from pymongo import MongoClient
 
 
@@ -31,7 +57,121 @@ def env(k, d=None):
     return os.getenv(k, d)
 
 
+# Lignes rapatriées par aller-retour sur les curseurs serveur (--itersize)
+DUMP_ITERSIZE = int(env("DUMP_ITERSIZE", "10000"))
+# MySQL/MariaDB en streaming : le serveur attend que le client lise (écriture
+# disque lente…) ; net_write_timeout/net_read_timeout de session relevés d'autant
+DUMP_NET_TIMEOUT = int(env("DUMP_NET_TIMEOUT", "3600"))
+# Mongo --fmt csv : documents échantillonnés ($sample) pour construire l'en-tête
+DUMP_SAMPLE_SIZE = int(env("DUMP_SAMPLE_SIZE", "1000"))
+# Taille des lectures de COPY TO STDOUT (PostgreSQL, --fmt csv)
+PG_COPY_READ_SIZE = 1 << 16
+# Intervalle (s) des lignes de progression par table (stderr)
+DUMP_PROGRESS_SECS = float(env("DUMP_PROGRESS_SECS", "10"))
+# --parts : plages lues en parallèle par table (1 = pas de découpage), pour
+# les tables d'au moins DUMP_PART_MIN_ROWS lignes (estimation)
+DUMP_PARTS = int(env("DUMP_PARTS", "1"))
+DUMP_PART_MIN_ROWS = int(env("DUMP_PART_MIN_ROWS", "100000"))
+# --incremental : fenêtre (en ids) de rattrapage des lignes commitées en retard
+DUMP_INCR_MARGIN = int(env("DUMP_INCR_MARGIN", "10000"))
+# --compress : taille des blocs (une trame chacun) et threads de compression
+DUMP_COMPRESS_BLOCK = int(env("DUMP_COMPRESS_BLOCK", str(4 << 20)))
+DUMP_COMPRESS_THREADS = int(env("DUMP_COMPRESS_THREADS", str(os.cpu_count() or 2)))
+
+
+def _progress(label, rows):
+    """Relaie `rows` en affichant (stderr) l'avancement toutes les DUMP_PROGRESS_SECS."""
+    t0 = last = time.perf_counter()
+    n = 0
+    for n, r in enumerate(rows, 1):
+        yield r
+        now = time.perf_counter()
+        if now - last >= DUMP_PROGRESS_SECS:
+            last = now
+            print(f"[dump] {label}: {n} lignes ({n / (now - t0):.0f} l/s)", file=sys.stderr)
+    dt = time.perf_counter() - t0
+    print(f"[dump] {label}: {n} lignes en {dt:.1f}s", file=sys.stderr)
+
+
+# === connexions (une par endpoint, réutilisée) ===
+# Chaque ouverture coûte une poignée TLS/mTLS (et, en pkcs11, une signature
+# HSM côté proxy) : les connexions restent ouvertes jusqu'à la fin du
+# programme. MySQL/MariaDB changent de base avec select_db ; PostgreSQL ne
+# le peut pas (une connexion par base) ; MongoClient sert toutes les bases.
+# Avec --all, chaque worker a ses propres connexions PG/MySQL (une connexion
+# ne se partage pas entre threads) ; le MongoClient, lui, est partagé.
+_POOL = {}
+_POOL_LOCK = threading.Lock()
+_OPENED = collections.Counter()
+
+
+def _pooled(key, open_conn, per_thread=True):
+    """
+    Connexion du slot (endpoint, thread) ; ouverte hors verrou, pour que les
+    poignées TLS des workers se fassent en parallèle et qu'un endpoint
+    injoignable ne bloque pas les autres threads. Un slot partagé
+    (per_thread=False) ouvert deux fois en même temps garde la première
+    connexion et ferme l'autre.
+    """
+    slot = (key, threading.get_ident() if per_thread else None)
+    conn = _POOL.get(slot)
+    if conn is not None:
+        return conn
+    new = open_conn()
+    with _POOL_LOCK:
+        conn = _POOL.get(slot)
+        if conn is None:
+            conn = _POOL[slot] = new
+            _OPENED[key] += 1
+    if conn is not new:
+        new.close()
+    return conn
+
+
+def _drop_thread_connections():
+    """Ferme les connexions PG/MySQL du thread courant (état incertain après une erreur)."""
+    me = threading.get_ident()
+    with _POOL_LOCK:
+        slots = [slot for slot in _POOL if slot[1] == me]
+        conns = [_POOL.pop(slot) for slot in slots]
+    for conn in conns:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def close_connections():
+    """Ferme les connexions et affiche (stderr) le nombre ouvert par endpoint."""
+    for pool in (_PART_POOL, _COMPRESS_POOL):
+        if pool is not None:
+            pool.shutdown()
+    for conn in _POOL.values():
+        try:
+            conn.close()
+        except Exception:
+            pass
+    _POOL.clear()
+    for key, n in sorted(_OPENED.items()):
+        print(f"[conn] {'/'.join(key)}: {n} connexion(s)", file=sys.stderr)
+
+
 def _pg_conn(db, variant, for_catalog=False):
+    return _pooled(("pg", variant, db), lambda: _open_pg(db, variant))
+
+
+def _mysql_conn(db, variant, mariadb=False):
+    engine = "mariadb" if mariadb else "mysql"
+    conn = _pooled((engine, variant), lambda: _open_mysql(variant, mariadb))
+    conn.select_db(db)
+    return conn
+
+
+def _mongo_client(db, variant):
+    return _pooled(("mongo", variant), lambda: _open_mongo(variant), per_thread=False)
+
+
+def _open_pg(db, variant):
     port = {
         "mdp": int(env("PG_MDP_PORT", "5432")),
         "tls": int(env("PG_TLS_PORT", "15432")),
@@ -46,7 +186,7 @@ def _pg_conn(db, variant, for_catalog=False):
     return psycopg2.connect(dsn)
 
 
-def _mysql_conn(db, variant, mariadb=False):
+def _open_mysql(variant, mariadb=False):
     port = int(env(("MARIADB_" if mariadb else "MYSQL_") + variant.upper() + "_PORT"))
     pwd = env(("MARIADB_" if mariadb else "MYSQL_") + "ROOT_PASSWORD", "rootpwd")
 
@@ -66,12 +206,17 @@ def _mysql_conn(db, variant, mariadb=False):
             "key": "./certs/client/client.key",
         }
 
+    # Timeouts réseau relevés dès l'ouverture (lecture en streaming, voir dump_mysql_like)
+    init = (
+        f"SET SESSION net_write_timeout = {DUMP_NET_TIMEOUT}, "
+        f"net_read_timeout = {DUMP_NET_TIMEOUT}"
+    )
     return pymysql.connect(
-        host=host, port=port, user="root", password=pwd, database=db, ssl=ssl
+        host=host, port=port, user="root", password=pwd, ssl=ssl, init_command=init
     )
 
 
-def _mongo_client(db, variant):
+def _open_mongo(variant):
     port = int(env("MONGO_" + variant.upper() + "_PORT", "27017"))
     u = env("MONGO_INITDB_ROOT_USERNAME", "admin")
     w = env("MONGO_INITDB_ROOT_PASSWORD", "adminpwd")
@@ -105,10 +250,13 @@ def discover_pg_dbs(variant):
     pat = re.compile(r"^pg_(mdp|tls|mtls|pkcs11)_[0-9]+$")
     names = [n for n in names if pat.match(n)]  # <— filtre
     cur.close()
-    conn.close()
     return names
 
 
+# Objets internes du seeder (points de reprise, base de bench) : jamais listés ni dumpés
+SEEDER_INTERNAL_PREFIX = "_seed_"
+
+
 def discover_mysql_like_dbs(variant, mariadb=False):
     conn = _mysql_conn("information_schema", variant, mariadb)
     cur = conn.cursor()
@@ -117,120 +265,1507 @@ def discover_mysql_like_dbs(variant, mariadb=False):
         r[0]
         for r in cur.fetchall()
         if r[0] not in ("information_schema", "mysql", "performance_schema", "sys")
+        and not r[0].startswith(SEEDER_INTERNAL_PREFIX)
     ]
     cur.close()
-    conn.close()
     return dbs
 
 
 def discover_mongo_dbs(variant):
     c = _mongo_client("admin", variant)
-    dbs = [d for d in c.list_database_names() if d not in ("admin", "local", "config")]
-    c.close()
+    dbs = [
+        d
+        for d in c.list_database_names()
+        if d not in ("admin", "local", "config")
+        and not d.startswith(SEEDER_INTERNAL_PREFIX)
+    ]
     return dbs
 
 
 # === list objects ===
-def list_pg(db, variant):
+def pg_tables(db, variant):
     conn = _pg_conn(db, variant)
     cur = conn.cursor()
     cur.execute(
         "SELECT table_name FROM information_schema.tables WHERE table_schema='public' ORDER BY 1;"
     )
-    for (t,) in cur.fetchall():
-        print(t)
+    names = [t for (t,) in cur.fetchall() if not t.startswith(SEEDER_INTERNAL_PREFIX)]
     cur.close()
-    conn.close()
+    conn.commit()
+    return names
 
 
-def list_mysql_like(db, variant, mariadb=False):
+def mysql_like_tables(db, variant, mariadb=False):
     conn = _mysql_conn(db, variant, mariadb)
     cur = conn.cursor()
     cur.execute("SHOW TABLES;")
-    for (t,) in cur.fetchall():
-        print(t)
+    names = [t for (t,) in cur.fetchall() if not t.startswith(SEEDER_INTERNAL_PREFIX)]
     cur.close()
-    conn.close()
+    return names
 
 
-def list_mongo(db, variant):
+def mongo_collections(db, variant):
     c = _mongo_client(db, variant)
-    print("\n".join(sorted(c[db].list_collection_names())))
-    c.close()
+    return sorted(
+        n
+        for n in c[db].list_collection_names()
+        if not n.startswith(SEEDER_INTERNAL_PREFIX)
+    )
+
+
+def list_pg(db, variant):
+    for t in pg_tables(db, variant):
+        print(t)
+
+
+def list_mysql_like(db, variant, mariadb=False):
+    for t in mysql_like_tables(db, variant, mariadb):
+        print(t)
+
+
+def list_mongo(db, variant):
+    print("\n".join(mongo_collections(db, variant)))
+
+
+# === compression (--compress) ===
+# Les données sont découpées en blocs de DUMP_COMPRESS_BLOCK octets, chacun
+# compressé en trame autonome (membre gzip, trame zstd ou lz4) : un fichier
+# est une suite de trames, que gunzip/zstd -d/lz4 -d lisent d'un trait, et
+# des fichiers compressés se recollent par simple concaténation. Chaque
+# fichier a un index <fichier>.idx pour y lire à partir d'un offset.
+Codec = collections.namedtuple("Codec", "name level ext frame")
+COMPRESS_EXT = {"gzip": ".gz", "zstd": ".zst", "lz4": ".lz4"}
+_COMPRESS_POOL = None
+_EXECUTORS_LOCK = threading.Lock()  # création des pools partagés (compression, plages)
+
+
+def make_codec(name, level=None):
+    """Codec de --compress ; `frame` compresse un bloc en trame autonome (appelé dans le pool)."""
+    if name == "gzip":
+        lvl = 6 if level is None else level
+        frame = functools.partial(gzip.compress, compresslevel=lvl, mtime=0)
+    elif name == "zstd":
+        import zstandard  # optionnel : pip install zstandard
+
+        lvl = 3 if level is None else level
+        # un ZstdCompressor ne se partage pas entre threads : un par bloc
+        frame = lambda data: zstandard.ZstdCompressor(level=lvl).compress(data)  # noqa: E731
+    else:
+        import lz4.frame  # optionnel : pip install lz4
+
+        lvl = 0 if level is None else level
+        frame = functools.partial(lz4.frame.compress, compression_level=lvl)
+    return Codec(name, level, COMPRESS_EXT[name], frame)
+
+
+def _compress_pool():
+    """Threads de compression partagés par tous les fichiers (zlib/zstd/lz4 relâchent le GIL)."""
+    global _COMPRESS_POOL
+    with _EXECUTORS_LOCK:
+        if _COMPRESS_POOL is None:
+            _COMPRESS_POOL = ThreadPoolExecutor(
+                max_workers=DUMP_COMPRESS_THREADS, thread_name_prefix="compress"
+            )
+    return _COMPRESS_POOL
+
+
+class _FrameWriter(io.BufferedIOBase):
+    """
+    Fichier binaire compressé en arrière-plan : les blocs partent dans le
+    pool de compression et les trames sont écrites dans l'ordre, avec au
+    plus DUMP_COMPRESS_THREADS blocs en vol par fichier (mémoire bornée).
+    Un fichier vide contient une trame vide (il reste décompressable).
+    À la fermeture, l'index des trames est écrit dans <path>.idx.
+    """
+
+    def __init__(self, path, codec):
+        super().__init__()
+        self._path = path
+        self._f = open(path, "wb")
+        self._frame = codec.frame
+        self._buf = bytearray()
+        self._pending = collections.deque()
+        self._frames = 0
+        self._raw = 0
+        self._submitted = 0  # octets non compressés partis en trames
+        self._written = 0  # octets compressés écrits
+        self._index = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._buf += b
+        self._raw += len(b)
+        if len(self._buf) >= DUMP_COMPRESS_BLOCK:
+            self._submit()
+        return len(b)
+
+    def tell(self):
+        return self._raw  # octets non compressés
+
+    def _submit(self):
+        fut = _compress_pool().submit(self._frame, bytes(self._buf))
+        self._pending.append((self._submitted, fut))
+        self._submitted += len(self._buf)
+        self._buf.clear()
+        self._frames += 1
+        while len(self._pending) > DUMP_COMPRESS_THREADS:
+            self._write_frame()
+
+    def _write_frame(self):
+        raw, fut = self._pending.popleft()
+        data = fut.result()
+        self._index.append((raw, self._written))
+        self._f.write(data)
+        self._written += len(data)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._buf or not self._frames:
+                self._submit()
+            while self._pending:
+                self._write_frame()
+            _write_index(self._path, self._index, (self._submitted, self._written))
+        finally:
+            self._f.close()
+            super().close()
+
+
+def _index_path(path):
+    return path + ".idx"
+
+
+def _write_index(path, frames, end):
+    """
+    <path>.idx : une ligne « offset non compressé<TAB>offset compressé » par
+    trame, puis une dernière ligne avec les tailles totales. Pour lire à
+    partir de l'offset X, décompresser depuis la dernière trame qui commence
+    à X ou avant.
+    """
+    with open(_index_path(path), "w", encoding="ascii") as f:
+        for raw, comp in [*frames, end]:
+            f.write(f"{raw}\t{comp}\n")
+
+
+def _read_index(path):
+    """(trames, tailles totales) de l'index de `path`."""
+    with open(_index_path(path), encoding="ascii") as f:
+        rows = [tuple(map(int, line.split("\t"))) for line in f]
+    return rows[:-1], rows[-1]
+
+
+def _suffix(fmt, codec=None):
+    """Extension des fichiers : Parquet/Arrow compressent en interne, sans suffixe."""
+    if codec is None or fmt in COLUMNAR_FMTS:
+        return fmt
+    return fmt + codec.ext
+
+
+def _open_out(path, codec=None, text=True):
+    """Fichier de sortie, texte UTF-8 ou binaire, compressé si `codec`."""
+    if codec is None:
+        if text:
+            return open(path, "w", newline="", encoding="utf-8")
+        return open(path, "wb")
+    f = _FrameWriter(path, codec)
+    return io.TextIOWrapper(f, encoding="utf-8", newline="") if text else f
+
+
+def _is_empty_output(path, codec=None):
+    """Fichier (ou fragment) sans données : vide, ou réduit à la trame vide du codec."""
+    size = os.path.getsize(path)
+    if codec is None or size == 0:
+        return size == 0
+    empty = codec.frame(b"")
+    if size != len(empty):
+        return False
+    with open(path, "rb") as f:
+        return f.read() == empty
+
+
+# === plages (--parts) ===
+# Colonne de découpage des tables SQL (clé primaire entière des tables
+# seedées) ; les collections Mongo sont découpées sur _id
+PART_KEY = "id"
+PG_INT_TYPES = ("smallint", "integer", "bigint")
+MYSQL_INT_TYPES = ("tinyint", "smallint", "mediumint", "int", "bigint")
+_PART_POOL = None
+
+
+def _part_pool(workers):
+    """
+    Lecteurs de plages, partagés par tout le processus (donc par les workers
+    de --all) : des threads durables, qui réutilisent leurs connexions.
+    """
+    global _PART_POOL
+    with _EXECUTORS_LOCK:
+        if _PART_POOL is None:
+            _PART_POOL = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="part")
+    return _PART_POOL
+
+
+def _split_ranges(parts, lo=None, hi=None, bounds=None):
+    """
+    Plages [début, fin[ successives (None = non bornée) couvrant toute la
+    clé : coupées aux quantiles de `bounds` (histogramme, échantillon trié)
+    s'il est assez fourni, sinon régulièrement entre `lo` et `hi`.
+    """
+    if bounds and len(bounds) > parts:
+        points = [bounds[len(bounds) * i // parts] for i in range(1, parts)]
+    elif lo is not None and hi is not None and hi > lo:
+        points = [lo + (hi - lo + 1) * i // parts for i in range(1, parts)]
+    else:
+        return [(None, None)]
+    points = sorted(set(points))
+    return list(zip([None, *points], [*points, None]))
+
+
+def _range_where(key, rng):
+    """
+    Clause WHERE (et paramètres) d'une plage [lo, hi[ (None = non bornée).
+    --incremental passe (lo, hi, also, skip) : ids `also` repris en plus de
+    la plage, ids `skip` écartés (voir _dump_incremental).
+    """
+    lo, hi, also, skip = (*rng, (), ())[:4]
+    conds, params = [], []
+    if lo is not None:
+        conds.append(f"{key} >= %s")
+        params.append(lo)
+    if hi is not None:
+        conds.append(f"{key} < %s")
+        params.append(hi)
+    where = " AND ".join(conds)
+    if also and where:
+        where = f"({where}) OR {key} IN ({', '.join(['%s'] * len(also))})"
+        params += also
+    if skip:
+        not_in = f"{key} NOT IN ({', '.join(['%s'] * len(skip))})"
+        where = f"({where}) AND {not_in}" if where else not_in
+        params += skip
+    return (" WHERE " + where if where else ""), params
+
+
+def _pg_ranges(conn, t, parts, min_rows):
+    """Plages de PART_KEY : bornes de l'histogramme de pg_stats (après ANALYZE), sinon min/max."""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_schema = 'public' AND table_name = %s AND column_name = %s",
+            (t, PART_KEY),
+        )
+        row = cur.fetchone()
+        if not row or row[0] not in PG_INT_TYPES:
+            conn.commit()
+            return [(None, None)]
+        cur.execute(f'SELECT min("{PART_KEY}"), max("{PART_KEY}") FROM "{t}"')
+        lo, hi = cur.fetchone()
+        cur.execute(
+            "SELECT c.reltuples::bigint, ("
+            "  SELECT s.histogram_bounds::text::bigint[] FROM pg_stats s"
+            "  WHERE s.schemaname = 'public' AND s.tablename = %s AND s.attname = %s)"
+            " FROM pg_class c WHERE c.oid = %s::regclass",
+            (t, PART_KEY, f'"{t}"'),
+        )
+        reltuples, bounds = cur.fetchone()
+    conn.commit()
+    if lo is None:
+        return [(None, None)]
+    # reltuples vaut -1 (ou 0) tant que la table n'a pas été analysée
+    if (reltuples if reltuples > 0 else hi - lo + 1) < min_rows:
+        return [(None, None)]
+    return _split_ranges(parts, lo, hi, bounds)
+
+
+def _mysql_ranges(conn, t, parts, min_rows):
+    """Plages de PART_KEY, coupées régulièrement entre min et max."""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT c.DATA_TYPE, t.TABLE_ROWS FROM information_schema.COLUMNS c "
+            "JOIN information_schema.TABLES t "
+            "ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME "
+            "WHERE c.TABLE_SCHEMA = DATABASE() AND c.TABLE_NAME = %s AND c.COLUMN_NAME = %s",
+            (t, PART_KEY),
+        )
+        row = cur.fetchone()
+        if not row or row[0].lower() not in MYSQL_INT_TYPES:
+            return [(None, None)]
+        cur.execute(f"SELECT MIN(`{PART_KEY}`), MAX(`{PART_KEY}`) FROM `{t}`")
+        lo, hi = cur.fetchone()
+    if lo is None:
+        return [(None, None)]
+    # TABLE_ROWS est une estimation (InnoDB), NULL si inconnue
+    if (row[1] or hi - lo + 1) < min_rows:
+        return [(None, None)]
+    return _split_ranges(parts, lo, hi)
+
+
+def _mongo_ranges(coll, parts, min_rows, sample_size):
+    """Plages d'_id aux quantiles d'un échantillon ($sample) : vaut pour tout type d'_id."""
+    if coll.estimated_document_count() < min_rows:
+        return [(None, None)]
+    sample = coll.aggregate([{"$sample": {"size": sample_size}}, {"$project": {"_id": 1}}])
+    ids = [d["_id"] for d in sample]
+    try:
+        ids.sort()
+    except TypeError:  # _id de types mêlés : pas d'ordre Python commun
+        return [(None, None)]
+    return _split_ranges(parts, bounds=ids)
+
+
+def _mongo_range_filter(rng):
+    lo, hi, also, skip = (*rng, (), ())[:4]
+    cond = {}
+    if lo is not None:
+        cond["$gte"] = lo
+    if hi is not None:
+        cond["$lt"] = hi
+    filt = {"_id": cond} if cond else {}
+    if also and filt:
+        filt = {"$or": [filt, {"_id": {"$in": list(also)}}]}
+    if skip:
+        nin = {"_id": {"$nin": list(skip)}}
+        filt = {"$and": [filt, nin]} if filt else nin
+    return filt
+
+
+def _run_part(dump_range, *args):
+    try:
+        dump_range(*args)
+    except Exception:
+        _drop_thread_connections()
+        raise
+
+
+def _dump_parts(out, db, name, fmt, ranges, concat, dump_range, codec=None):
+    """
+    Une plage : dump direct dans out/<db>_<name>.<fmt>[.gz|.zst|.lz4]. Sinon chaque plage
+    est lue en parallèle (une connexion par lecteur) dans
+    <db>_<name>.partNNN.<fmt>, puis les parties sont, avec `concat`,
+    recollées dans l'ordre des plages. Les parties destinées à être recollées
+    sont des fragments : en-tête CSV dans la première seulement, objets JSON
+    sans crochets ; compressées, elles se recollent sans recompression.
+    Parquet/Arrow ne se recollent pas : les parties restent des fichiers
+    autonomes (un jeu de données que pyarrow.dataset lit d'un bloc).
+
+    dump_range(path, rng, label, header, fragment) écrit une plage.
+    """
+    suffix = _suffix(fmt, codec)
+    concat = concat and fmt not in COLUMNAR_FMTS
+    path = os.path.join(out, f"{db}_{name}.{suffix}")
+    if len(ranges) == 1:
+        dump_range(path, ranges[0], f"{db}.{name}", True, False)
+        return
+    n = len(ranges)
+    paths = [os.path.join(out, f"{db}_{name}.part{k:03d}.{suffix}") for k in range(n)]
+    pool = _part_pool(n)
+    futs = [
+        pool.submit(
+            _run_part, dump_range, p, rng, f"{db}.{name} [{k + 1}/{n}]",
+            k == 0 or not concat, concat,
+        )
+        for k, (p, rng) in enumerate(zip(paths, ranges))
+    ]
+    wait(futs)
+    for fut in futs:
+        fut.result()  # remonte la première erreur
+    if concat:
+        _concat_parts(path, paths, fmt, codec)
+        print(f"[dump] {db}.{name}: {n} parties recollées", file=sys.stderr)
+
+
+def _concat_parts(path, paths, fmt, codec=None):
+    """
+    Recolle les fragments octet par octet (JSON : crochets et séparateurs
+    ajoutés, en trames à part si compressé) puis les supprime. Compressés,
+    leurs index sont décalés et fusionnés dans celui du fichier final.
+    """
+    index, raw, comp = [], 0, 0
+
+    def literal(data):
+        nonlocal raw, comp
+        if codec is None:
+            return data
+        frame = codec.frame(data)
+        index.append((raw, comp))
+        raw, comp = raw + len(data), comp + len(frame)
+        return frame
+
+    with open(path, "wb") as f:
+        if fmt == "json":
+            f.write(literal(b"["))
+        wrote = False
+        for p in paths:
+            if fmt == "json" and not _is_empty_output(p, codec):
+                if wrote:
+                    f.write(literal(b", "))
+                wrote = True
+            with open(p, "rb") as part:
+                shutil.copyfileobj(part, f)
+            if codec:
+                frames, (part_raw, part_comp) = _read_index(p)
+                index += [(r + raw, c + comp) for r, c in frames]
+                raw, comp = raw + part_raw, comp + part_comp
+                os.remove(_index_path(p))
+        if fmt == "json":
+            f.write(literal(b"]"))
+    if codec:
+        _write_index(path, index, (raw, comp))
+    spills = [_spill_path(p, codec) for p in paths if os.path.exists(_spill_path(p, codec))]
+    if spills:
+        with open(_spill_path(path, codec), "wb") as f:
+            for p in spills:
+                with open(p, "rb") as part:
+                    shutil.copyfileobj(part, f)
+    for p in paths + spills:
+        os.remove(p)
+
+
+def _output_paths(out, db, name, suffix):
+    """
+    Fichiers d'un dump : fichier final et/ou parties gardées, avec leurs
+    index et fichiers spill (existants).
+    """
+    paths = [os.path.join(out, f"{db}_{name}.{suffix}")]
+    pattern = f"{glob.escape(db)}_{glob.escape(name)}.part*.{suffix}"
+    paths += sorted(glob.glob(os.path.join(glob.escape(out), pattern)))
+    fmt = suffix.split(".")[0]
+    paths = [
+        q
+        for p in paths
+        for q in (p, _index_path(p), p[: -len(suffix)] + fmt + ".spill.ndjson")
+    ]
+    return [p for p in paths if os.path.exists(p)]
+
+
+def _output_bytes(out, db, name, suffix):
+    """Taille du dump d'une table : fichier final ou parties, plus ses deltas (--incremental)."""
+    pattern = f"{glob.escape(db)}_{glob.escape(name)}.*{suffix}"
+    paths = glob.glob(os.path.join(glob.escape(out), pattern))
+    return sum(os.path.getsize(p) for p in paths if p.endswith("." + suffix))
+
+
+# === dumps incrémentaux (--incremental) ===
+# Chaîne par table : un dump complet, puis des deltas <db>_<table>.deltaNNNN.<fmt>
+# des lignes d'id (_id) au-delà du watermark, le plus haut id déjà exporté.
+MANIFEST_NAME = "dump_manifest.json"
+# Empreinte du schéma, clé ordonnée (watermark possible) ?, plus haut id
+# (None : table vide), et ids entiers absents de la fenêtre [since, high]
+TableState = collections.namedtuple("TableState", "fingerprint ordered high since gaps")
+
+
+class Manifest:
+    """
+    État des dumps incrémentaux, un JSON réécrit (fichier temporaire puis
+    os.replace) après chaque table : un run interrompu garde l'état des
+    tables terminées, les autres repartent de leur watermark précédent.
+    Les watermarks ObjectId sont écrits en JSON étendu ({"$oid": ...}).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.tables = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.tables = json_util.loads(f.read())["tables"]
+
+    def get(self, key):
+        with self._lock:
+            return self.tables.get(key)
+
+    def put(self, key, entry):
+        with self._lock:
+            self.tables[key] = entry
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(
+                    json_util.dumps({"version": 1, "tables": self.tables}, indent=1, sort_keys=True)
+                )
+            os.replace(tmp, self.path)
+
+
+def _fingerprint(obj):
+    return hashlib.sha256(json_util.dumps(obj, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _window(low, high):
+    """Début de la fenêtre de rattrapage : DUMP_INCR_MARGIN ids sous `high`, au plus bas `low`."""
+    if high is None or DUMP_INCR_MARGIN <= 0:
+        return None
+    return max(low, high - DUMP_INCR_MARGIN + 1)
+
+
+def _gaps(since, high, present):
+    if since is None:
+        return []
+    present = set(present)
+    return [i for i in range(since, high + 1) if i not in present]
+
+
+def _pg_table_state(conn, t):
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT column_name, data_type FROM information_schema.columns "
+            "WHERE table_schema = 'public' AND table_name = %s ORDER BY ordinal_position",
+            (t,),
+        )
+        cols = cur.fetchall()
+        int_key = dict(cols).get(PART_KEY) in PG_INT_TYPES
+        high = since = None
+        present = ()
+        if int_key:
+            cur.execute(f'SELECT min("{PART_KEY}"), max("{PART_KEY}") FROM "{t}"')
+            low, high = cur.fetchone()
+            since = _window(low, high)
+            if since is not None:
+                cur.execute(
+                    f'SELECT "{PART_KEY}" FROM "{t}" WHERE "{PART_KEY}" BETWEEN %s AND %s',
+                    (since, high),
+                )
+                present = [r[0] for r in cur.fetchall()]
+    conn.commit()
+    return TableState(_fingerprint(cols), int_key, high, since, _gaps(since, high, present))
+
+
+def _pg_count(conn, t, rng):
+    where, params = _range_where(f'"{PART_KEY}"', rng)
+    with conn.cursor() as cur:
+        cur.execute(f'SELECT count(*) FROM "{t}"' + where, params)
+        n = cur.fetchone()[0]
+    conn.commit()
+    return n
+
+
+def _mysql_table_state(conn, t):
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT COLUMN_NAME, COLUMN_TYPE FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY ORDINAL_POSITION",
+            (t,),
+        )
+        cols = [(name, ctype.lower()) for name, ctype in cur.fetchall()]
+        ctype = dict(cols).get(PART_KEY, "")
+        int_key = ctype.split("(")[0].split()[0] in MYSQL_INT_TYPES if ctype else False
+        high = since = None
+        present = ()
+        if int_key:
+            cur.execute(f"SELECT MIN(`{PART_KEY}`), MAX(`{PART_KEY}`) FROM `{t}`")
+            low, high = cur.fetchone()
+            since = _window(low, high)
+            if since is not None:
+                cur.execute(
+                    f"SELECT `{PART_KEY}` FROM `{t}` WHERE `{PART_KEY}` BETWEEN %s AND %s",
+                    (since, high),
+                )
+                present = [r[0] for r in cur.fetchall()]
+    return TableState(_fingerprint(cols), int_key, high, since, _gaps(since, high, present))
+
+
+def _mysql_count(conn, t, rng):
+    where, params = _range_where(f"`{PART_KEY}`", rng)
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT COUNT(*) FROM `{t}`{where}", params)
+        return cur.fetchone()[0]
+
+
+def _mongo_table_state(coll):
+    """
+    Schéma Mongo : options (validateur…) et clés des index. Watermark sur
+    _id s'ils sont tous entiers ou tous ObjectId (ordre total) ; fenêtre de
+    rattrapage pour les entiers seulement.
+    """
+    indexes = sorted(json_util.dumps(ix["key"]) for ix in coll.list_indexes())
+    first = coll.find_one({}, {"_id": 1}, sort=[("_id", 1)])
+    last = coll.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+    low, high = (first["_id"], last["_id"]) if last else (None, None)
+    is_int = isinstance(high, int) and not isinstance(high, bool)
+    ordered = high is None or (
+        type(low) is type(high) and (is_int or isinstance(high, ObjectId))
+    )
+    since = _window(low, high) if ordered and is_int else None
+    present = ()
+    if since is not None:
+        present = [d["_id"] for d in coll.find({"_id": {"$gte": since, "$lte": high}}, {"_id": 1})]
+    return TableState(
+        _fingerprint({"options": coll.options(), "indexes": indexes}),
+        ordered,
+        high if ordered else None,
+        since,
+        _gaps(since, high, present),
+    )
+
+
+def _successor(v):
+    """Clé suivante : id + 1, ou ObjectId suivant (12 octets comparés en big-endian)."""
+    if isinstance(v, ObjectId):
+        return ObjectId((int.from_bytes(v.binary, "big") + 1).to_bytes(12, "big"))
+    return v + 1
+
+
+def _bounded_ranges(ranges, lo, high):
+    """Ferme les plages extrêmes : à partir de `lo` (si donné), jusqu'à `high` inclus."""
+    ranges = list(ranges)
+    if lo is not None:
+        ranges[0] = (lo, ranges[0][1])
+    ranges[-1] = (ranges[-1][0], _successor(high))
+    return ranges
+
+
+def _full_dump_reason(prev, state, suffix):
+    """Pourquoi refaire un dump complet plutôt qu'un delta (None : delta possible)."""
+    high = state.high
+    wm = prev["watermark"] if prev else None
+    if prev is None:
+        return "premier dump"
+    if prev["fingerprint"] != state.fingerprint:
+        return "schéma modifié"
+    if prev["suffix"] != suffix:
+        return "format modifié"
+    if not state.ordered:
+        return f"pas de clé {PART_KEY}/_id ordonnée"
+    if wm is not None and (high is None or type(high) is not type(wm)):
+        return "table vidée ou type de clé modifié"
+    if wm is not None and high < wm:
+        return "ids en recul (table recréée ?)"
+    return None
+
+
+def _dump_incremental(
+    manifest, key, out, db, name, fmt, concat, dump_range, codec,
+    state, full_ranges, count, parts, min_rows, extra=None,
+):
+    """
+    Dump complet (premier passage, schéma ou format changé, id en recul,
+    clé non ordonnée), sinon delta des lignes d'id > watermark. La lecture
+    s'arrête au plus haut id relevé avant de commencer.
+
+    Les ids SERIAL/AUTO_INCREMENT sont attribués avant le commit : l'id N
+    peut devenir visible après N+1. Les ids absents de la fenêtre des
+    DUMP_INCR_MARGIN derniers (state.gaps) sont donc écartés du dump et
+    notés dans le manifeste ; le run suivant reprend ceux qui sont apparus.
+    Une ligne commitée plus de DUMP_INCR_MARGIN ids en retard reste perdue ;
+    pour les _id ObjectId (générés côté client), pas de fenêtre.
+
+    full_ranges() : plages d'un dump complet ; count(rng) : lignes d'une plage ;
+    extra : champs ajoutés à l'entrée du manifeste (colonnes CSV Mongo).
+    """
+    suffix = _suffix(fmt, codec)
+    label = f"{db}.{name}"
+    prev = manifest.get(key)
+    high = state.high
+    wm = prev["watermark"] if prev else None
+    reason = _full_dump_reason(prev, state, suffix)
+    now = time.strftime("%Y-%m-%dT%H:%M:%S")
+    skip = tuple(state.gaps)
+    # trous précédents apparus depuis (et encore dans la fenêtre)
+    also = tuple(
+        g for g in (prev or {}).get("gaps", [])
+        if g not in set(skip) and state.since is not None and g >= state.since
+    )
+
+    if reason:
+        ranges = full_ranges()
+        if high is not None:
+            ranges = _bounded_ranges(ranges, None, high)
+        ranges = [(lo, hi, (), skip) for lo, hi in ranges]
+        _dump_parts(out, db, name, fmt, ranges, concat, dump_range, codec)
+        files = [os.path.basename(p) for p in _output_paths(out, db, name, suffix)]
+        for f in prev["files"] if prev else []:
+            if f not in files and os.path.exists(os.path.join(out, f)):
+                os.remove(os.path.join(out, f))
+        rows = count((None, None if high is None else _successor(high), (), skip))
+        entry = {
+            "fingerprint": state.fingerprint,
+            "suffix": suffix,
+            "watermark": high,
+            "rows": rows,
+            "deltas": 0,
+            "files": files,
+            "full_at": now,
+        }
+        print(
+            f"[incr] {label}: dump complet ({reason}), {rows} lignes, watermark {high}",
+            file=sys.stderr,
+        )
+    elif not also and (high is None or (wm is not None and high <= wm)):
+        entry = dict(prev)
+        print(f"[incr] {label}: rien de nouveau (watermark {wm})", file=sys.stderr)
+    else:
+        high = high if wm is None or high > wm else wm
+        lo = None if wm is None else _successor(wm)
+        ranges = [(None, None)]
+        if parts > 1 and isinstance(lo, int) and high - lo + 1 >= min_rows:
+            ranges = _split_ranges(parts, lo, high)
+        ranges = _bounded_ranges(ranges, lo, high)
+        ranges = [(a, b, also if k == 0 else (), skip) for k, (a, b) in enumerate(ranges)]
+        seq = prev["deltas"] + 1
+        delta = f"{name}.delta{seq:04d}"
+        _dump_parts(out, db, delta, fmt, ranges, concat, dump_range, codec)
+        rows = count((lo, _successor(high), also, skip))
+        entry = {
+            **prev,
+            "watermark": high,
+            "rows": prev["rows"] + rows,
+            "deltas": seq,
+            "files": prev["files"] + [
+                os.path.basename(p) for p in _output_paths(out, db, delta, suffix)
+            ],
+        }
+        print(
+            f"[incr] {label}: delta {seq} ({rows} lignes, ids {lo}..{high}"
+            + (f" + {len(also)} en retard" if also else "")
+            + ")",
+            file=sys.stderr,
+        )
+    entry["gaps"] = list(skip)
+    entry.update(extra or {})
+    entry["updated_at"] = now
+    manifest.put(key, entry)
 
 
 # === dump objects ===
-def dump_pg(db, variant, tables, out, fmt):
+def _pg_copy_csv(conn, t, path, label, where, params, header, codec=None):
+    """CSV produit par le serveur (COPY ... TO STDOUT) et recopié tel quel dans le fichier."""
+    t0 = time.perf_counter()
+    with conn.cursor() as cur, _open_out(path, codec, text=False) as f:
+        query = f'SELECT * FROM "{t}"' + (cur.mogrify(where, params).decode() if where else "")
+        cur.copy_expert(
+            f"COPY ({query}) TO STDOUT "
+            f"WITH (FORMAT csv, HEADER {'true' if header else 'false'}, ENCODING 'UTF8')",
+            f,
+            size=PG_COPY_READ_SIZE,
+        )
+        size = f.tell()
+    conn.commit()
+    print(
+        f"[dump] {label}: COPY CSV {size} octets en {time.perf_counter() - t0:.1f}s",
+        file=sys.stderr,
+    )
+
+
+def dump_pg(
+    db,
+    variant,
+    tables,
+    out,
+    fmt,
+    itersize=DUMP_ITERSIZE,
+    csv_mode="copy",
+    parts=1,
+    concat=True,
+    part_min_rows=DUMP_PART_MIN_ROWS,
+    codec=None,
+    manifest=None,
+):
+    """
+    Curseur nommé (côté serveur) : les lignes arrivent par paquets de
+    `itersize` et sont écrites au fil de l'eau, mémoire constante par table.
+    En CSV (csv_mode="copy"), c'est le serveur qui formate : COPY TO STDOUT.
+    Avec parts > 1, les tables d'au moins `part_min_rows` lignes sont lues
+    par plages d'id en parallèle (voir _dump_parts).
+    """
     conn = _pg_conn(db, variant)
-    cur = conn.cursor()
     os.makedirs(out, exist_ok=True)
+
+    def dump_range(t, path, rng, label, header, fragment):
+        conn = _pg_conn(db, variant)
+        where, params = _range_where(f'"{PART_KEY}"', rng)
+        if fmt == "csv" and csv_mode == "copy":
+            _pg_copy_csv(conn, t, path, label, where, params, header, codec)
+            return
+        cur = conn.cursor(name="dump_rows")
+        cur.itersize = itersize
+        try:
+            cur.execute(f'SELECT * FROM "{t}"' + where, params)
+            rows = iter(cur)
+            # description n'est connue qu'après le premier paquet
+            first = list(itertools.islice(rows, 1))
+            cols = [d[0] for d in cur.description]
+            types = _pg_arrow_types(cur.description) if fmt in COLUMNAR_FMTS else None
+            rows = _progress(label, itertools.chain(first, rows))
+            _write_rows(path, cols, rows, fmt, header, fragment, codec, types)
+        finally:
+            cur.close()
+        conn.commit()
+
+    def full_ranges(t):
+        return _pg_ranges(conn, t, parts, part_min_rows) if parts > 1 else [(None, None)]
+
     for t in tables:
-        cur.execute(f'SELECT * FROM "{t}"')
-        cols = [d[0] for d in cur.description]
-        rows = cur.fetchall()
-        _write_rows(out, db, t, cols, rows, fmt)
-    cur.close()
-    conn.close()
+        dump_range_ = functools.partial(dump_range, t)
+        if manifest is None:
+            _dump_parts(out, db, t, fmt, full_ranges(t), concat, dump_range_, codec)
+            continue
+        _dump_incremental(
+            manifest, f"pg:{variant}:{db}.{t}", out, db, t, fmt, concat, dump_range_, codec,
+            _pg_table_state(conn, t), functools.partial(full_ranges, t),
+            functools.partial(_pg_count, conn, t), parts, part_min_rows,
+        )
+
+
+def _fetch_batches(cur, n):
+    while True:
+        batch = cur.fetchmany(n)
+        if not batch:
+            return
+        yield from batch
 
 
-def dump_mysql_like(db, variant, tables, out, fmt, mariadb=False):
+def dump_mysql_like(
+    db,
+    variant,
+    tables,
+    out,
+    fmt,
+    mariadb=False,
+    itersize=DUMP_ITERSIZE,
+    parts=1,
+    concat=True,
+    part_min_rows=DUMP_PART_MIN_ROWS,
+    codec=None,
+    manifest=None,
+):
+    """
+    Curseur non bufferisé (SSCursor) : les lignes sont lues sur la socket par
+    paquets de `itersize` (fetchmany) et écrites au fil de l'eau, sans copie
+    du résultat côté pilote. Tant que le résultat n'est pas lu jusqu'au bout,
+    le serveur garde la requête ouverte : ses timeouts réseau de session sont
+    relevés à DUMP_NET_TIMEOUT (à l'ouverture de la connexion). Avec
+    parts > 1, lecture par plages d'id en parallèle (voir _dump_parts).
+    """
     conn = _mysql_conn(db, variant, mariadb)
-    cur = conn.cursor()
     os.makedirs(out, exist_ok=True)
+
+    def dump_range(t, path, rng, label, header, fragment):
+        where, params = _range_where(f"`{PART_KEY}`", rng)
+        conn = _mysql_conn(db, variant, mariadb)
+        # lu avant le SELECT : la connexion reste ensuite occupée par le streaming
+        info = _mysql_column_types(conn, t) if fmt in COLUMNAR_FMTS else None
+        cur = conn.cursor(pymysql.cursors.SSCursor)
+        try:
+            cur.execute(f"SELECT * FROM `{t}`{where};", params)
+            cols = [d[0] for d in cur.description]
+            types = _mysql_arrow_types(info, cols) if info is not None else None
+            rows = _progress(label, _fetch_batches(cur, itersize))
+            _write_rows(path, cols, rows, fmt, header, fragment, codec, types)
+        finally:
+            cur.close()  # lit et jette le reste du résultat en cas d'erreur
+
+    def full_ranges(t):
+        return _mysql_ranges(conn, t, parts, part_min_rows) if parts > 1 else [(None, None)]
+
+    engine = "mariadb" if mariadb else "mysql"
     for t in tables:
-        cur.execute(f"SELECT * FROM `{t}`;")
-        cols = [d[0] for d in cur.description]
-        rows = cur.fetchall()
-        _write_rows(out, db, t, cols, rows, fmt)
-    cur.close()
-    conn.close()
+        dump_range_ = functools.partial(dump_range, t)
+        if manifest is None:
+            _dump_parts(out, db, t, fmt, full_ranges(t), concat, dump_range_, codec)
+            continue
+        _dump_incremental(
+            manifest, f"{engine}:{variant}:{db}.{t}", out, db, t, fmt, concat, dump_range_,
+            codec, _mysql_table_state(conn, t), functools.partial(full_ranges, t),
+            functools.partial(_mysql_count, conn, t), parts, part_min_rows,
+        )
+
+
+def _mongo_csv_keys(coll, mode, sample_size):
+    """
+    Clés de premier niveau pour l'en-tête CSV, agrégées côté serveur
+    ($objectToArray) : sur un échantillon ($sample, mode "sample") ou sur
+    toute la collection (mode "scan", exact mais coûteux côté serveur).
+    """
+    pipeline = [{"$sample": {"size": sample_size}}] if mode == "sample" else []
+    pipeline += [
+        {"$project": {"kv": {"$objectToArray": "$$ROOT"}}},
+        {"$unwind": "$kv"},
+        {"$group": {"_id": "$kv.k"}},
+    ]
+    return sorted(d["_id"] for d in coll.aggregate(pipeline, allowDiskUse=True))
+
+
+def _spill_path(path, codec=None):
+    """<db>_<col>.csv[.gz] -> <db>_<col>.csv.spill.ndjson (jamais compressé)."""
+    return (path[: -len(codec.ext)] if codec else path) + ".spill.ndjson"
+
+
+def _spill_extra_keys(docs, keys, spill_path):
+    """
+    Relaie `docs` ; les clés absentes de `keys` (vues après l'échantillon)
+    partent, avec l'_id du document, dans `spill_path` (NDJSON).
+    """
+    known = set(keys)
+    spill, spilled = None, 0
+    try:
+        for d in docs:
+            yield d
+            extra = {k: v for k, v in d.items() if k not in known}
+            if extra:
+                if spill is None:
+                    spill = open(spill_path, "w", encoding="utf-8")
+                spill.write(json.dumps({"_id": d.get("_id"), **extra}, default=str) + "\n")
+                spilled += 1
+    finally:
+        if spill is not None:
+            spill.close()
+    if spilled:
+        print(
+            f"[dump] {os.path.basename(spill_path)}: {spilled} document(s) avec des clés "
+            "hors schéma",
+            file=sys.stderr,
+        )
+
+
+def _write_mongo_csv(path, keys, docs, header=True, codec=None):
+    """
+    Une passe, en-tête `keys` ; clés hors en-tête : voir _spill_extra_keys.
+    Sans clés (collection vide), fichier vide.
+    """
+    with _open_out(path, codec) as f:
+        w = csv.DictWriter(f, fieldnames=keys)
+        if header and keys:
+            w.writeheader()
+        for d in _spill_extra_keys(docs, keys, _spill_path(path, codec)):
+            w.writerow({k: d.get(k, "") for k in keys})
+
+
+def _dump_mongo_bson(coll, path, label, filt, itersize, codec=None):
+    """
+    Façon mongodump : documents lus en RawBSONDocument et recopiés tels quels
+    (chaque document BSON commence par sa longueur), sans décodage. Le
+    fichier se relit avec bson.decode_file_iter ou mongorestore.
+    """
+    raw = coll.with_options(codec_options=CodecOptions(document_class=RawBSONDocument))
+    docs = _progress(label, raw.find(filt, batch_size=itersize))
+    with _open_out(path, codec, text=False) as f:
+        for d in docs:
+            f.write(d.raw)
 
 
-def dump_mongo(db, variant, colls, out, fmt):
+def _write_mongo_metadata(coll, path):
+    meta = {
+        "collectionName": coll.name,
+        "type": "collection",
+        "options": coll.options(),
+        "indexes": list(coll.list_indexes()),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json_util.dumps(meta, json_options=json_util.CANONICAL_JSON_OPTIONS))
+
+
+def dump_mongo(
+    db,
+    variant,
+    colls,
+    out,
+    fmt,
+    itersize=DUMP_ITERSIZE,
+    csv_keys="sample",
+    sample_size=DUMP_SAMPLE_SIZE,
+    metadata=False,
+    parts=1,
+    concat=True,
+    part_min_rows=DUMP_PART_MIN_ROWS,
+    codec=None,
+    manifest=None,
+):
+    """
+    Curseur lu par paquets de `itersize` documents, écrits au fil de l'eau
+    (une seule passe). Avec parts > 1, lecture par plages d'_id en parallèle
+    (voir _dump_parts).
+    """
     c = _mongo_client(db, variant)
     os.makedirs(out, exist_ok=True)
-    for col in colls:
-        docs = list(c[db][col].find({}))
+
+    def dump_range(coll, keys, types, path, rng, label, header, fragment):
+        filt = _mongo_range_filter(rng)
+        if fmt == "bson":
+            _dump_mongo_bson(coll, path, label, filt, itersize, codec)
+            return
+        docs = _progress(label, coll.find(filt, batch_size=itersize))
         if fmt == "csv":
-            path = os.path.join(out, f"{db}_{col}.csv")
-            if not docs:
-                open(path, "w").close()
-                continue
-            keys = sorted({k for d in docs for k in d.keys()})
-            with open(path, "w", newline="", encoding="utf-8") as f:
-                w = csv.DictWriter(f, fieldnames=keys)
-                w.writeheader()
-                for d in docs:
-                    w.writerow({k: d.get(k, "") for k in keys})
+            _write_mongo_csv(path, keys, docs, header, codec)
+        elif fmt in COLUMNAR_FMTS:
+            docs = _spill_extra_keys(docs, keys, _spill_path(path))
+            rows = (tuple(d.get(k) for k in keys) for d in docs)
+            _write_columnar(path, fmt, keys, types, rows, codec)
         elif fmt == "ndjson":
-            with open(
-                os.path.join(out, f"{db}_{col}.ndjson"), "w", encoding="utf-8"
-            ) as f:
+            with _open_out(path, codec) as f:
                 for d in docs:
                     f.write(json.dumps(d, default=str) + "\n")
         else:
-            with open(
-                os.path.join(out, f"{db}_{col}.json"), "w", encoding="utf-8"
-            ) as f:
-                json.dump(docs, f, default=str)
-    c.close()
-
-
-def _write_rows(out, db, t, cols, rows, fmt):
-    if fmt == "csv":
-        with open(
-            os.path.join(out, f"{db}_{t}.csv"), "w", newline="", encoding="utf-8"
-        ) as f:
+            with _open_out(path, codec) as f:
+                _write_json_array(f, docs, brackets=not fragment)
+
+    for col in colls:
+        coll = c[db][col]
+        key = f"mongo:{variant}:{db}.{col}"
+        state = _mongo_table_state(coll) if manifest is not None else None
+        keys = types = None
+        if fmt == "csv":
+            prev = manifest.get(key) if manifest is not None else None
+            if prev and _full_dump_reason(prev, state, _suffix(fmt, codec)) is None:
+                # delta : colonnes du dump de base, clés nouvelles dans le spill
+                keys = prev.get("keys")
+            keys = keys or _mongo_csv_keys(coll, csv_keys, sample_size)
+        elif fmt in COLUMNAR_FMTS:
+            # collection vide : schéma réduit à _id
+            keys = _mongo_csv_keys(coll, csv_keys, sample_size) or ["_id"]
+            types = _mongo_arrow_types(coll, keys, sample_size)
+
+        def full_ranges(coll=coll):
+            if parts > 1:
+                return _mongo_ranges(coll, parts, part_min_rows, sample_size)
+            return [(None, None)]
+
+        dump_range_ = functools.partial(dump_range, coll, keys, types)
+        if manifest is None:
+            _dump_parts(out, db, col, fmt, full_ranges(), concat, dump_range_, codec)
+        else:
+            _dump_incremental(
+                manifest, key, out, db, col, fmt, concat,
+                dump_range_, codec, state, full_ranges,
+                lambda rng, coll=coll: coll.count_documents(_mongo_range_filter(rng)),
+                parts, part_min_rows, {"keys": keys} if fmt == "csv" else None,
+            )
+        if fmt == "bson" and metadata:
+            _write_mongo_metadata(coll, os.path.join(out, f"{db}_{col}.metadata.json"))
+
+
+def _write_json_array(f, objs, brackets=True):
+    """
+    Tableau JSON écrit objet par objet (même sortie que json.dump d'une
+    liste) ; sans crochets, un fragment à recoller (voir _concat_parts).
+    """
+    if brackets:
+        f.write("[")
+    for i, o in enumerate(objs):
+        if i:
+            f.write(", ")
+        f.write(json.dumps(o, default=str))
+    if brackets:
+        f.write("]")
+
+
+def _write_rows(path, cols, rows, fmt, header=True, fragment=False, codec=None, types=None):
+    """
+    Écrit `rows` (itérable, consommé au fil de l'eau) dans `path` au format
+    `fmt` ; Parquet/Arrow demandent `types` (voir _write_columnar).
+    """
+    if fmt in COLUMNAR_FMTS:
+        _write_columnar(path, fmt, cols, types, rows, codec)
+    elif fmt == "csv":
+        with _open_out(path, codec) as f:
             w = csv.writer(f)
-            w.writerow(cols)
+            if header:
+                w.writerow(cols)
             w.writerows(rows)
     elif fmt == "ndjson":
-        with open(os.path.join(out, f"{db}_{t}.ndjson"), "w", encoding="utf-8") as f:
+        with _open_out(path, codec) as f:
             for r in rows:
                 f.write(json.dumps(dict(zip(cols, r)), default=str) + "\n")
     else:
-        with open(os.path.join(out, f"{db}_{t}.json"), "w", encoding="utf-8") as f:
-            json.dump([dict(zip(cols, r)) for r in rows], f, default=str)
+        with _open_out(path, codec) as f:
+            _write_json_array(f, (dict(zip(cols, r)) for r in rows), brackets=not fragment)
+
+
+# === formats colonnes (--fmt parquet|arrow) ===
+# pyarrow est optionnel (pip install pyarrow), importé seulement pour ces formats
+COLUMNAR_FMTS = ("parquet", "arrow")
+# Lignes par row group Parquet / record batch Arrow (mémoire bornée par paquet)
+DUMP_ROW_GROUP = int(env("DUMP_ROW_GROUP", "131072"))
+
+# Type Arrow (nom logique, voir _arrow_type) par OID PostgreSQL de cur.description
+PG_ARROW_TYPES = {
+    16: "bool",
+    17: "binary",  # bytea
+    20: "int64",
+    21: "int16",
+    23: "int32",
+    25: "string",
+    114: "json",
+    700: "float32",
+    701: "float64",
+    1042: "string",
+    1043: "string",
+    1082: "date32",
+    1114: "timestamp",
+    1184: "timestamptz",
+    3802: "json",  # jsonb
+}
+# ... et par DATA_TYPE MySQL/MariaDB (information_schema : distingue TEXT et
+# BLOB, que cur.description confond) ; tinyint(1) -> bool
+MYSQL_ARROW_TYPES = {
+    "tinyint": "int8",
+    "smallint": "int16",
+    "mediumint": "int32",
+    "int": "int32",
+    "bigint": "int64",
+    "year": "int16",
+    "float": "float32",
+    "double": "float64",
+    "date": "date32",
+    "datetime": "timestamp",
+    "timestamp": "timestamp",
+    "json": "json_text",
+    "char": "string",
+    "varchar": "string",
+    "tinytext": "string",
+    "text": "string",
+    "mediumtext": "string",
+    "longtext": "string",
+    "enum": "string",
+    "set": "string",
+    "binary": "binary",
+    "varbinary": "binary",
+    "tinyblob": "binary",
+    "blob": "binary",
+    "mediumblob": "binary",
+    "longblob": "binary",
+}
+
+
+# Conversion Python appliquée aux valeurs non nulles avant pa.array ("str" :
+# repli textuel des types sans équivalent Arrow : decimal, ObjectId, time…)
+_ARROW_CONVERT = {"bool": bool, "json": json_util.dumps, "str": str}
+
+
+def _arrow_type(name):
+    import pyarrow as pa
+
+    if name in ("json", "json_text"):
+        # type d'extension arrow.json (pyarrow >= 19), sinon simple chaîne
+        return pa.json_() if hasattr(pa, "json_") else pa.string()
+    return {
+        "bool": pa.bool_(),
+        "int8": pa.int8(),
+        "int16": pa.int16(),
+        "int32": pa.int32(),
+        "int64": pa.int64(),
+        "uint64": pa.uint64(),
+        "float32": pa.float32(),
+        "float64": pa.float64(),
+        "string": pa.string(),
+        "str": pa.string(),
+        "binary": pa.binary(),
+        "date32": pa.date32(),
+        "timestamp": pa.timestamp("us"),
+        "timestamptz": pa.timestamp("us", tz="UTC"),
+    }[name]
+
+
+def _pg_arrow_types(description):
+    return [PG_ARROW_TYPES.get(d[1], "str") for d in description]
+
+
+def _mysql_column_types(conn, t):
+    """{colonne: (DATA_TYPE, COLUMN_TYPE)} d'une table."""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT COLUMN_NAME, DATA_TYPE, COLUMN_TYPE FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            (t,),
+        )
+        return {name: (dtype.lower(), ctype.lower()) for name, dtype, ctype in cur.fetchall()}
+
+
+def _mysql_arrow_types(info, cols):
+    types = []
+    for c in cols:
+        dtype, ctype = info.get(c, ("", ""))
+        if ctype.startswith("tinyint(1)"):
+            types.append("bool")
+        elif "unsigned" in ctype and dtype in ("int", "bigint"):
+            types.append("int64" if dtype == "int" else "uint64")
+        else:
+            types.append(MYSQL_ARROW_TYPES.get(dtype, "str"))
+    return types
+
+
+def _value_arrow_type(v):
+    if isinstance(v, bool):
+        return "bool"
+    if isinstance(v, int):
+        return "int64"
+    if isinstance(v, float):
+        return "float64"
+    if isinstance(v, str):
+        return "string"
+    if isinstance(v, bytes):
+        return "binary"
+    if isinstance(v, datetime.datetime):
+        return "timestamptz" if v.tzinfo else "timestamp"
+    if isinstance(v, ObjectId):
+        return "str"
+    return "json"
+
+
+# Types BSON ($type) compatibles avec chaque type Arrow tiré de l'échantillon
+_ARROW_BSON_TYPES = {
+    "bool": ("bool",),
+    "int64": ("int", "long"),
+    "float64": ("int", "long", "double"),
+    "string": ("string",),
+    "binary": ("binData",),
+    "timestamp": ("date",),
+    "timestamptz": ("date",),
+    "str": ("objectId",),
+}
+
+
+def _fits_arrow_type(v, kind):
+    vk = _value_arrow_type(v)
+    return v is None or vk == kind or (kind == "float64" and vk == "int64")
+
+
+def _mongo_type_mismatch(key, kind):
+    """Documents où `key` existe avec un type BSON incompatible avec `kind` (tableaux compris)."""
+    others = [{key: {"$not": {"$type": t}}} for t in _ARROW_BSON_TYPES[kind]]
+    return {"$or": [{key: {"$type": "array"}}, {"$and": [{key: {"$ne": None}}, *others]}]}
+
+
+def _mongo_checked_types(coll, keys, types):
+    """
+    Vérifie les types de l'échantillon sur toute la collection : une requête
+    cherche un document en défaut sur l'une des clés typées (un seul passage
+    si tout est conforme). Les clés en défaut passent en JSON étendu, puis
+    la requête est relancée sur les autres.
+    """
+    types = [
+        "json" if t != "json" and ("." in k or k.startswith("$")) else t
+        for k, t in zip(keys, types)
+    ]
+    while True:
+        typed = [j for j, t in enumerate(types) if t != "json"]
+        if not typed:
+            return types
+        bad = coll.find_one(
+            {"$or": [_mongo_type_mismatch(keys[j], types[j]) for j in typed]},
+            {keys[j]: 1 for j in typed},
+        )
+        if bad is None:
+            return types
+        wrong = [j for j in typed if not _fits_arrow_type(bad.get(keys[j]), types[j])]
+        for j in wrong or typed:
+            types[j] = "json"
+
+
+def _mongo_arrow_types(coll, keys, sample_size):
+    """
+    Type par clé d'après un échantillon ($sample) : un seul type observé ->
+    son équivalent Arrow ; entiers et flottants -> float64 ; sinon (types
+    mêlés, clé jamais vue dans l'échantillon) JSON étendu. Les types retenus
+    sont ensuite vérifiés sur toute la collection (_mongo_checked_types).
+    """
+    seen = collections.defaultdict(set)
+    for d in coll.aggregate([{"$sample": {"size": sample_size}}]):
+        for k, v in d.items():
+            if v is not None:
+                seen[k].add(_value_arrow_type(v))
+    types = []
+    for k in keys:
+        kinds = seen.get(k, set())
+        if len(kinds) == 1:
+            types.append(kinds.pop())
+        elif kinds == {"int64", "float64"}:
+            types.append("float64")
+        else:
+            types.append("json")
+    return _mongo_checked_types(coll, keys, types)
+
+
+def _columnar_writer(path, fmt, schema, codec=None):
+    """ParquetWriter ou fichier Arrow IPC ; --compress devient la compression interne."""
+    import pyarrow as pa
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetWriter(
+            path,
+            schema,
+            compression=codec.name if codec else "none",
+            compression_level=codec.level if codec else None,
+        )
+    options = None
+    if codec:
+        options = pa.ipc.IpcWriteOptions(
+            compression=pa.Codec(codec.name, compression_level=codec.level)
+        )
+    return pa.ipc.new_file(path, schema, options=options)
+
+
+def _write_columnar(path, fmt, cols, types, rows, codec=None):
+    """
+    Écrit `rows` (tuples) par paquets de DUMP_ROW_GROUP lignes : un row
+    group Parquet ou un record batch Arrow par paquet, colonne par colonne
+    avec le type Arrow de `types`. En cas d'erreur, le fichier incomplet
+    est supprimé.
+    """
+    import pyarrow as pa
+
+    schema = pa.schema([(c, _arrow_type(t)) for c, t in zip(cols, types)])
+    convs = [_ARROW_CONVERT.get(t) for t in types]
+    writer = _columnar_writer(path, fmt, schema, codec)
+    done = False
+    try:
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, DUMP_ROW_GROUP))
+            if not chunk:
+                break
+            arrays = []
+            for j, conv in enumerate(convs):
+                vals = [r[j] for r in chunk]
+                if conv is not None:
+                    vals = [None if v is None else conv(v) for v in vals]
+                try:
+                    arrays.append(pa.array(vals, type=schema.field(j).type))
+                except (pa.ArrowException, TypeError, ValueError, OverflowError) as e:
+                    raise ValueError(f"{path}: colonne {cols[j]!r} ({types[j]}) : {e}") from e
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+        done = True
+    finally:
+        writer.close()
+        if not done and os.path.exists(path):
+            os.remove(path)
+
+
+# === tout dumper (--all) ===
+ENGINES = ("pg", "mysql", "mariadb", "mongo")
+VARIANTS = ("mdp", "tls", "mtls", "pkcs11")
+
+
+def discover_objects(engine, variant):
+    """[(base, [tables/collections])] d'un endpoint (moteur × variante)."""
+    if engine == "pg":
+        return [(db, pg_tables(db, variant)) for db in discover_pg_dbs(variant)]
+    if engine in ("mysql", "mariadb"):
+        mariadb = engine == "mariadb"
+        return [
+            (db, mysql_like_tables(db, variant, mariadb))
+            for db in discover_mysql_like_dbs(variant, mariadb)
+        ]
+    return [(db, mongo_collections(db, variant)) for db in discover_mongo_dbs(variant)]
+
+
+def dump_one(engine, variant, db, name, a):
+    """Dump d'une table/collection avec les options de la ligne de commande `a`."""
+    parts = dict(
+        parts=a.parts, concat=not a.keep_parts, part_min_rows=a.part_min_rows, codec=a.codec,
+        manifest=a.manifest,
+    )
+    if engine == "pg":
+        dump_pg(db, variant, [name], a.out, a.fmt, a.itersize, a.pg_csv, **parts)
+    elif engine in ("mysql", "mariadb"):
+        dump_mysql_like(
+            db, variant, [name], a.out, a.fmt, mariadb=(engine == "mariadb"),
+            itersize=a.itersize, **parts,
+        )
+    else:
+        dump_mongo(
+            db, variant, [name], a.out, a.fmt,
+            itersize=a.itersize, csv_keys=a.csv_keys, sample_size=a.sample_size,
+            metadata=a.metadata, **parts,
+        )
+
+
+def _timed_dump(task, a):
+    t0 = time.perf_counter()
+    try:
+        dump_one(*task, a)
+        err = None
+    except Exception as e:
+        err = f"{type(e).__name__}: {e}"
+        _drop_thread_connections()
+    return time.perf_counter() - t0, err
+
+
+def _interleave(tasks):
+    # 1re table de chaque endpoint, puis 2e, etc. : les workers se répartissent
+    # sur les serveurs plutôt que de tous charger le même
+    rank = collections.Counter()
+    keyed = []
+    for task in tasks:
+        endpoint = task[:2]
+        keyed.append((rank[endpoint], task))
+        rank[endpoint] += 1
+    return [task for _, task in sorted(keyed)]
+
+
+def dump_all(a):
+    """
+    Découvre moteurs × variantes × bases × tables dans ce processus puis les
+    dumpe avec `a.jobs` workers ; connexions réutilisées par endpoint. Un
+    endpoint injoignable est signalé et ignoré ; renvoie False si un dump a échoué.
+    """
+    engines = [a.engine] if a.engine else ENGINES
+    variants = a.variant or VARIANTS
+    fmt = a.fmt
+    if fmt == "bson":
+        engines = [e for e in engines if e == "mongo"]
+    suffix = _suffix(fmt, a.codec)
+    os.makedirs(a.out, exist_ok=True)
+    t0 = time.perf_counter()
+
+    tasks, unreachable = [], []
+    with ThreadPoolExecutor(max_workers=max(1, a.jobs), thread_name_prefix="discover") as ex:
+        futs = {ex.submit(discover_objects, e, v): (e, v) for e in engines for v in variants}
+        for fut in as_completed(futs):
+            e, v = futs[fut]
+            try:
+                found = fut.result()
+            except Exception as err:
+                unreachable.append((e, v, f"{type(err).__name__}: {err}"))
+                print(f"[all] {e}:{v} ignoré ({type(err).__name__}: {err})", file=sys.stderr)
+                continue
+            for db, names in found:
+                tasks += [(e, v, db, n) for n in names]
+    tasks = _interleave(sorted(tasks))
+    print(
+        f"[all] {len(tasks)} tables/collections, jobs={a.jobs}, "
+        f"découverte en {time.perf_counter() - t0:.1f}s",
+        file=sys.stderr,
+    )
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, a.jobs), thread_name_prefix="dump") as ex:
+        futs = {ex.submit(_timed_dump, task, a): task for task in tasks}
+        for done, fut in enumerate(as_completed(futs), 1):
+            task = futs[fut]
+            seconds, err = fut.result()
+            size = _output_bytes(a.out, task[2], task[3], suffix) if err is None else 0
+            results.append((task, seconds, size, err))
+            e, v, db, name = task
+            status = "ok" if err is None else f"ÉCHEC {err}"
+            print(
+                f"[all] {done}/{len(tasks)} {e}:{v} {db}.{name} {status} ({seconds:.1f}s)",
+                file=sys.stderr,
+            )
+    print_dump_summary(results, unreachable, time.perf_counter() - t0)
+    return all(err is None for *_, err in results)
+
+
+def print_dump_summary(results, unreachable, elapsed):
+    width = max([len(f"{t[2]}.{t[3]}") for t, *_ in results] + [5])
+    print("\n=== DUMP SUMMARY ===")
+    print(f"{'endpoint':<14}  {'table':<{width}}  status  duration       bytes  error")
+    for (e, v, db, name), seconds, size, err in sorted(results, key=lambda r: -r[1]):
+        status = "ok" if err is None else "FAILED"
+        print(
+            f"{e + ':' + v:<14}  {db + '.' + name:<{width}}  {status:<6}  "
+            f"{seconds:7.1f}s  {size:>10}  {err or ''}"
+        )
+    for e, v, err in unreachable:
+        print(f"{e + ':' + v:<14}  {'-':<{width}}  skip    {'-':>8}  {'-':>10}  {err}")
+    failed = sum(1 for *_, err in results if err)
+    total = sum(r[2] for r in results)
+    print(
+        f"=== {len(results) - failed} ok, {failed} failed, {len(unreachable)} endpoint(s) "
+        f"ignoré(s), {total} octets en {elapsed:.1f}s ===\n",
+        flush=True,
+    )
 
 
 # === main ===
@@ -238,21 +1773,129 @@ def main():
     import argparse
 
     ap = argparse.ArgumentParser()
+    ap.add_argument("--engine", choices=ENGINES)
     ap.add_argument(
-        "--engine", required=True, choices=["pg", "mysql", "mariadb", "mongo"]
+        "--variant",
+        action="append",
+        choices=VARIANTS,
+        help="répétable avec --all (défaut : toutes les variantes)",
     )
     ap.add_argument(
-        "--variant", required=True, choices=["mdp", "tls", "mtls", "pkcs11"]
+        "--all",
+        action="store_true",
+        help="tout découvrir et dumper (filtré par --engine/--variant s'ils sont donnés)",
+    )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=int(env("DUMP_JOBS", "4")),
+        help="--all : tables dumpées en parallèle (défaut DUMP_JOBS=4)",
     )
     ap.add_argument("--list-dbs", action="store_true")
     ap.add_argument("--db")
     ap.add_argument("--list", action="store_true")
     ap.add_argument("--tables")
     ap.add_argument("--collections")
-    ap.add_argument("--fmt", default="json", choices=["json", "csv", "ndjson"])
+    ap.add_argument(
+        "--fmt", default="json", choices=["json", "csv", "ndjson", "bson", *COLUMNAR_FMTS]
+    )
     ap.add_argument("--out", default="./dumps")
+    ap.add_argument(
+        "--itersize",
+        type=int,
+        default=DUMP_ITERSIZE,
+        help="lignes par paquet des curseurs en streaming (défaut DUMP_ITERSIZE=10000)",
+    )
+    ap.add_argument(
+        "--csv-keys",
+        default="sample",
+        choices=["sample", "scan"],
+        help="Mongo --fmt csv : en-tête tiré d'un échantillon ($sample, défaut) ou de toute la collection",
+    )
+    ap.add_argument(
+        "--sample-size",
+        type=int,
+        default=DUMP_SAMPLE_SIZE,
+        help="documents échantillonnés pour l'en-tête CSV Mongo (défaut DUMP_SAMPLE_SIZE=1000)",
+    )
+    ap.add_argument(
+        "--metadata",
+        action="store_true",
+        help="Mongo --fmt bson : écrit aussi <db>_<col>.metadata.json (options, index)",
+    )
+    ap.add_argument(
+        "--pg-csv",
+        default="copy",
+        choices=["copy", "rows"],
+        help="PostgreSQL --fmt csv : COPY TO STDOUT côté serveur (défaut) ou lignes Python",
+    )
+    ap.add_argument(
+        "--parts",
+        type=int,
+        default=DUMP_PARTS,
+        help="plages d'id (_id sur Mongo) lues en parallèle par table (défaut DUMP_PARTS=1)",
+    )
+    ap.add_argument(
+        "--part-min-rows",
+        type=int,
+        default=DUMP_PART_MIN_ROWS,
+        help="--parts : tables plus petites dumpées d'un bloc (défaut DUMP_PART_MIN_ROWS=100000)",
+    )
+    ap.add_argument(
+        "--keep-parts",
+        action="store_true",
+        help="--parts : garder les fichiers <db>_<table>.partNNN.<fmt> sans les recoller",
+    )
+    ap.add_argument(
+        "--compress",
+        choices=sorted(COMPRESS_EXT),
+        help="compresse les fichiers (.gz/.zst/.lz4) par blocs, dans DUMP_COMPRESS_THREADS threads",
+    )
+    ap.add_argument(
+        "--compress-level",
+        type=int,
+        help="niveau de compression (défaut : gzip 6, zstd 3, lz4 0)",
+    )
+    ap.add_argument(
+        "--incremental",
+        action="store_true",
+        help="n'exporte que les lignes d'id (_id) au-delà du watermark du manifeste (deltas)",
+    )
+    ap.add_argument(
+        "--manifest",
+        dest="manifest_path",
+        help=f"--incremental : état des watermarks (défaut <out>/{MANIFEST_NAME})",
+    )
     a = ap.parse_args()
 
+    a.manifest = None
+    if a.incremental:
+        os.makedirs(a.out, exist_ok=True)
+        a.manifest = Manifest(a.manifest_path or os.path.join(a.out, MANIFEST_NAME))
+    a.codec = None
+    if a.compress:
+        try:
+            a.codec = make_codec(a.compress, a.compress_level)
+        except ImportError as e:
+            print(f"❌ --compress {a.compress} : module {e.name} manquant (pip install {e.name})")
+            sys.exit(1)
+    if a.fmt in COLUMNAR_FMTS:
+        if importlib.util.find_spec("pyarrow") is None:
+            print(f"❌ --fmt {a.fmt} : module pyarrow manquant (pip install pyarrow)")
+            sys.exit(1)
+        if a.fmt == "arrow" and a.compress == "gzip":
+            print("❌ --fmt arrow : compression lz4 ou zstd seulement")
+            sys.exit(1)
+
+    if a.all:
+        if not dump_all(a):
+            sys.exit(1)
+        return
+    if not (a.engine and a.variant) or len(a.variant) > 1:
+        print("❌ --engine et une seule --variant requis sauf avec --all")
+        sys.exit(1)
+    a.variant = a.variant[0]
+
     # Découverte des DB
     if a.list_dbs:
         dbs = (
@@ -270,6 +1913,9 @@ def main():
     if not a.db:
         print("❌ --db requis sauf avec --list-dbs")
         sys.exit(1)
+    if a.fmt == "bson" and a.engine != "mongo":
+        print("❌ --fmt bson réservé à --engine mongo")
+        sys.exit(1)
 
     # Lister ou dumper
     if a.engine == "pg":
@@ -279,7 +1925,11 @@ def main():
         if not a.tables:
             print("No --tables")
             sys.exit(1)
-        dump_pg(a.db, a.variant, a.tables.split(","), a.out, a.fmt)
+        dump_pg(
+            a.db, a.variant, a.tables.split(","), a.out, a.fmt, a.itersize, a.pg_csv,
+            parts=a.parts, concat=not a.keep_parts, part_min_rows=a.part_min_rows,
+            codec=a.codec, manifest=a.manifest,
+        )
     elif a.engine in ("mysql", "mariadb"):
         mariadb = a.engine == "mariadb"
         if a.list:
@@ -289,7 +1939,9 @@ def main():
             print("No --tables")
             sys.exit(1)
         dump_mysql_like(
-            a.db, a.variant, a.tables.split(","), a.out, a.fmt, mariadb=mariadb
+            a.db, a.variant, a.tables.split(","), a.out, a.fmt, mariadb=mariadb,
+            itersize=a.itersize, parts=a.parts, concat=not a.keep_parts,
+            part_min_rows=a.part_min_rows, codec=a.codec, manifest=a.manifest,
         )
     else:
         if a.list:
@@ -298,8 +1950,16 @@ def main():
         if not a.collections:
             print("No --collections")
             sys.exit(1)
-        dump_mongo(a.db, a.variant, a.collections.split(","), a.out, a.fmt)
+        dump_mongo(
+            a.db, a.variant, a.collections.split(","), a.out, a.fmt,
+            itersize=a.itersize, csv_keys=a.csv_keys, sample_size=a.sample_size,
+            metadata=a.metadata, parts=a.parts, concat=not a.keep_parts,
+            part_min_rows=a.part_min_rows, codec=a.codec, manifest=a.manifest,
+        )
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        close_connections()